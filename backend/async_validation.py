@@ -0,0 +1,82 @@
+"""
+Coalescing and caching for the I/O behind async validation rules.
+Identical in-flight lookups (same rule, same value) share one computation,
+and results are kept for a short TTL so debounced keystrokes from many
+users don't repeat the same store round trip.
+"""
+
+import asyncio
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Hashable, Tuple
+
+
+class SingleFlightCache:
+    """
+    Single-flight executor with a bounded TTL result cache.
+
+    Each computation runs as a task owned by the cache, so cancelling one
+    caller does not cancel it for the others. Invalidating a key drops its
+    cached result and detaches any in-flight computation, whose result is
+    then returned to its waiters but not cached.
+    """
+
+    def __init__(self, ttl: float = 2.0, maxsize: int = 10000):
+        self.ttl = ttl
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self._cache: "OrderedDict[Hashable, Tuple[float, Any]]" = OrderedDict()
+        self._inflight: Dict[Hashable, asyncio.Future] = {}
+
+    async def get(self, key: Hashable, compute: Callable[[], Awaitable[Any]]) -> Any:
+        """Return the cached result for `key`, joining or starting its computation."""
+        entry = self._cache.get(key)
+        if entry is not None:
+            if entry[0] > time.monotonic():
+                self.hits += 1
+                self._cache.move_to_end(key)
+                return entry[1]
+            del self._cache[key]
+
+        task = self._inflight.get(key)
+        if task is not None:
+            self.coalesced += 1
+        else:
+            self.misses += 1
+            task = asyncio.ensure_future(compute())
+            self._inflight[key] = task
+            task.add_done_callback(lambda done: self._finish(key, done))
+        # The computation belongs to the cache, so a cancelled caller only
+        # stops waiting for it; the other callers still get the result
+        return await asyncio.shield(task)
+
+    def _finish(self, key: Hashable, task: "asyncio.Future[Any]") -> None:
+        """Cache a finished computation's result, unless it failed or was invalidated."""
+        if self._inflight.get(key) is not task:
+            return
+        del self._inflight[key]
+        if not task.cancelled() and task.exception() is None:
+            self._store(key, task.result())
+
+    def invalidate(self, key: Hashable) -> None:
+        """Forget the cached result for a key, e.g. after the underlying data changed."""
+        self._cache.pop(key, None)
+        self._inflight.pop(key, None)
+
+    def _store(self, key: Hashable, result: Any) -> None:
+        self._cache[key] = (time.monotonic() + self.ttl, result)
+        self._cache.move_to_end(key)
+        while len(self._cache) > self.maxsize:
+            self._cache.popitem(last=False)
+
+    def stats(self) -> Dict[str, int]:
+        """Cache size and hit/miss/coalesced counters."""
+        return {
+            "size": len(self._cache),
+            "inflight": len(self._inflight),
+            "hits": self.hits,
+            "misses": self.misses,
+            "coalesced": self.coalesced,
+        }
@@ -0,0 +1,425 @@
+"""
+Benchmark harness for the schema delivery, validation and submission paths.
+Generates a synthetic FormSchema of configurable size with matching valid
+and invalid submissions, registers it with the application's schema
+registry, and drives the endpoints both by calling the ASGI app directly
+(in-process) and through an HTTP client over the ASGI transport. Results
+(throughput, p50/p99 latency, allocations per request) are printed as JSON
+so runs can be compared across commits:
+
+    python benchmark.py --params 40 --enum-size 10000 --output before.json
+    python benchmark.py --params 40 --enum-size 10000 --compare before.json
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import platform
+import random
+import statistics
+import subprocess
+import time
+import tracemalloc
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from urllib.parse import urlencode
+
+from models import (
+    BooleanContent, DateContent, DependentEnumContent, EnumContent, EnumValue,
+    FormSchema, NumberContent, Param, ParamCategory, RangeContent, StringContent
+)
+
+
+# Text patterns by regex complexity level, with a matching and a failing value
+REGEX_LEVELS: List[Tuple[Optional[str], str, str]] = [
+    (None, "plain text", ""),
+    (r"^[A-Za-z0-9]+$", "abc123", "abc 123"),
+    (r"^[a-z0-9._%+-]+@[a-z0-9-]+(\.[a-z0-9-]+)*\.[a-z]{2,}$", "user.name@mail.example.com", "user@@example"),
+    (r"^(?=.*[A-Z])(?=.*[a-z])(?=.*\d)[A-Za-z\d@$!%*?&]{8,64}$", "Passw0rdExample", "password"),
+]
+
+# Param kinds cycled through when generating a category
+PARAM_KINDS = ["text", "number", "list", "multi_select", "date", "range", "checkbox"]
+
+# Children mapped to each parent value in a dependent chain
+DEPENDENT_FANOUT = 8
+
+
+# ============================================================================
+# Synthetic Schemas
+# ============================================================================
+
+def _options(prefix: str, count: int) -> List[EnumValue]:
+    return [EnumValue(label=f"{prefix} {i}", value=f"{prefix}_{i}") for i in range(count)]
+
+
+def _param(kind: str, name: str, enum_size: int, regex_level: int) -> Param:
+    if kind == "text":
+        pattern = REGEX_LEVELS[regex_level][0]
+        content = StringContent(type="string", minLength=1, maxLength=128, pattern=pattern)
+        return Param(name=name, type="text_field", description=name, required=True, content=content)
+    if kind == "number":
+        content = NumberContent(type="integer", min=0, max=1000)
+        return Param(name=name, type="number_field", description=name, required=True, content=content)
+    if kind == "list":
+        content = EnumContent(type="enum", values=_options(name, enum_size))
+        return Param(name=name, type="list", description=name, required=True, content=content)
+    if kind == "multi_select":
+        content = EnumContent(type="enum", values=_options(name, enum_size), multiple=True, maxSelections=5)
+        return Param(name=name, type="multi_select", description=name, content=content)
+    if kind == "date":
+        content = DateContent(type="date", min="2000-01-01", max="2099-12-31", disabledDates=["2030-12-25"])
+        return Param(name=name, type="date_field", description=name, content=content)
+    if kind == "range":
+        content = RangeContent(type="number_range", min=0, max=10000, step=50)
+        return Param(name=name, type="range", description=name, content=content)
+    content = BooleanContent(type="boolean")
+    return Param(name=name, type="checkbox", description=name, content=content)
+
+
+def _dependent_chain(category: int, depth: int, enum_size: int) -> List[Param]:
+    """A list param followed by `depth` sub_lists, each depending on the previous one."""
+    root = f"c{category}_level0"
+    params = [Param(
+        name=root, type="list", description=root, required=True,
+        content=EnumContent(type="enum", values=_options(root, enum_size))
+    )]
+    parent_values = [option.value for option in params[0].content.values]
+    for level in range(1, depth + 1):
+        name = f"c{category}_level{level}"
+        mapping = {
+            parent: _options(f"{name}_{i}", DEPENDENT_FANOUT)
+            for i, parent in enumerate(parent_values)
+        }
+        params.append(Param(
+            name=name, type="sub_list", description=name, required=True, related=params[-1].name,
+            content=DependentEnumContent(type="dependent_enum", dependsOn=params[-1].name, mapping=mapping)
+        ))
+        parent_values = [option.value for values in mapping.values() for option in values]
+    return params
+
+
+def build_schema(
+    categories: int = 4,
+    params: int = 10,
+    enum_size: int = 20,
+    dependent_depth: int = 2,
+    regex_level: int = 2
+) -> FormSchema:
+    """
+    Synthetic schema with `categories` categories of `params` params each,
+    cycling through PARAM_KINDS; each category also has a dependent chain
+    of `dependent_depth` sub_lists.
+    """
+    result = []
+    for c in range(categories):
+        items = [
+            _param(PARAM_KINDS[i % len(PARAM_KINDS)], f"c{c}_p{i}", enum_size, regex_level)
+            for i in range(params)
+        ]
+        if dependent_depth:
+            items += _dependent_chain(c, dependent_depth, enum_size)
+        result.append(ParamCategory(name=f"category_{c}", params=items))
+    return FormSchema(paramCategories=result)
+
+
+def _valid_value(param: Param, regex_level: int, rng: random.Random, data: Dict[str, Any]) -> Any:
+    content = param.content
+    if content.type == "string":
+        return REGEX_LEVELS[regex_level][1]
+    if content.type == "integer":
+        return rng.randint(0, 1000)
+    if content.type == "enum":
+        values = [option.value for option in content.values]
+        return rng.sample(values, min(3, len(values))) if content.multiple else rng.choice(values)
+    if content.type == "dependent_enum":
+        return rng.choice(content.mapping[data[content.dependsOn]]).value
+    if content.type == "date":
+        return f"20{rng.randint(10, 29)}-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}"
+    if content.type == "number_range":
+        low = rng.randint(0, 100) * 50
+        return [low, low + 50 * rng.randint(0, 100)]
+    return rng.random() < 0.5
+
+
+def _invalid_value(param: Param, regex_level: int) -> Any:
+    content = param.content
+    if content.type == "string":
+        return REGEX_LEVELS[regex_level][2] if regex_level else "x" * 129
+    if content.type == "integer":
+        return 1000.5
+    if content.type == "enum":
+        return ["not_an_option"] * 6 if content.multiple else "not_an_option"
+    if content.type == "dependent_enum":
+        return "not_an_option"
+    if content.type == "date":
+        return "2030-12-25"
+    if content.type == "number_range":
+        return [25, 10]
+    return "yes"
+
+
+def build_submissions(
+    schema: FormSchema,
+    count: int,
+    regex_level: int = 2,
+    invalid_fields: float = 0.0,
+    seed: int = 0
+) -> List[Dict[str, Any]]:
+    """
+    Submission data for a schema: every param filled with a valid value,
+    then a fraction `invalid_fields` of them replaced with invalid ones.
+    """
+    rng = random.Random(seed)
+    params = [param for category in schema.paramCategories for param in category.params]
+    submissions = []
+    for _ in range(count):
+        data: Dict[str, Any] = {}
+        for param in params:
+            data[param.name] = _valid_value(param, regex_level, rng, data)
+        for param in params:
+            if rng.random() < invalid_fields:
+                data[param.name] = _invalid_value(param, regex_level)
+        submissions.append(data)
+    return submissions
+
+
+# ============================================================================
+# Drivers
+# ============================================================================
+
+class InProcessDriver:
+    """Calls the ASGI app directly, without an HTTP client."""
+    name = "inprocess"
+
+    def __init__(self, app):
+        self.app = app
+
+    async def request(self, method: str, path: str, query: str = "", body: bytes = b"") -> int:
+        scope = {
+            "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1",
+            "method": method, "scheme": "http", "path": path, "raw_path": path.encode(),
+            "query_string": query.encode(), "root_path": "",
+            "headers": [
+                (b"host", b"benchmark"),
+                (b"content-type", b"application/json"),
+                (b"content-length", str(len(body)).encode()),
+            ],
+            "client": ("127.0.0.1", 0), "server": ("benchmark", 80),
+        }
+        received = False
+        status = 0
+
+        async def receive():
+            nonlocal received
+            if received:
+                return {"type": "http.disconnect"}
+            received = True
+            return {"type": "http.request", "body": body, "more_body": False}
+
+        async def send(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+
+        await self.app(scope, receive, send)
+        return status
+
+    async def close(self) -> None:
+        pass
+
+
+class ClientDriver:
+    """Sends requests through httpx over the ASGI transport."""
+    name = "client"
+
+    def __init__(self, app):
+        import httpx
+        self.client = httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://benchmark")
+
+    async def request(self, method: str, path: str, query: str = "", body: bytes = b"") -> int:
+        url = f"{path}?{query}" if query else path
+        headers = {"content-type": "application/json"}
+        response = await self.client.request(method, url, content=body or None, headers=headers)
+        return response.status_code
+
+    async def close(self) -> None:
+        await self.client.aclose()
+
+
+# ============================================================================
+# Measurement
+# ============================================================================
+
+Operation = Callable[[int], Tuple[str, str, str, bytes]]
+
+
+async def measure(driver, operation: Operation, iterations: int, warmup: int, alloc_samples: int) -> Dict[str, Any]:
+    """Run one operation: latency percentiles, throughput and allocations per request."""
+    for i in range(warmup):
+        status = await driver.request(*operation(i))
+        if status >= 400:
+            raise RuntimeError(f"{operation.__name__} returned HTTP {status}")
+
+    latencies = []
+    started = time.perf_counter()
+    for i in range(iterations):
+        args = operation(i)
+        t0 = time.perf_counter_ns()
+        await driver.request(*args)
+        latencies.append(time.perf_counter_ns() - t0)
+    elapsed = time.perf_counter() - started
+
+    # Allocations are sampled in a separate pass; tracing skews timings
+    tracemalloc.start()
+    peaks = []
+    before = tracemalloc.get_traced_memory()[0]
+    for i in range(alloc_samples):
+        args = operation(i)
+        tracemalloc.reset_peak()
+        base = tracemalloc.get_traced_memory()[0]
+        await driver.request(*args)
+        peaks.append(tracemalloc.get_traced_memory()[1] - base)
+    retained = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+
+    latencies.sort()
+    return {
+        "iterations": iterations,
+        "throughput_per_s": round(iterations / elapsed, 1),
+        "p50_us": round(latencies[len(latencies) // 2] / 1000, 1),
+        "p99_us": round(latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))] / 1000, 1),
+        "mean_us": round(statistics.fmean(latencies) / 1000, 1),
+        "alloc_peak_bytes": int(statistics.median(peaks)) if peaks else None,
+        "alloc_retained_bytes": retained // alloc_samples if alloc_samples else None,
+    }
+
+
+def operations(schema_id: str, valid: List[bytes], invalid: List[bytes]) -> Dict[str, Operation]:
+    """The benchmarked requests, keyed by name."""
+    def get_schema(i):
+        return "GET", f"/api/schemas/{schema_id}", "", b""
+
+    def validate_valid(i):
+        return "POST", "/api/validate", "", valid[i % len(valid)]
+
+    def validate_invalid(i):
+        return "POST", "/api/validate", "", invalid[i % len(invalid)]
+
+    def submit_valid(i):
+        return "POST", "/api/submit", "", valid[i % len(valid)]
+
+    def get_submissions(i):
+        return "GET", "/api/submissions", urlencode({"form_id": schema_id, "limit": 100}), b""
+
+    return {op.__name__: op for op in (get_schema, validate_valid, validate_invalid, submit_valid, get_submissions)}
+
+
+async def run(args: argparse.Namespace) -> Dict[str, Any]:
+    import main
+
+    schema_id = "benchmark"
+    schema = build_schema(args.categories, args.params, args.enum_size, args.dependent_depth, args.regex_level)
+    entry = main.schema_registry.register(schema_id, schema)
+
+    def encode(datas):
+        return [json.dumps({"formId": schema_id, "data": data}).encode("utf-8") for data in datas]
+
+    valid = encode(build_submissions(schema, 64, args.regex_level, 0.0, seed=1))
+    invalid = encode(build_submissions(schema, 64, args.regex_level, args.invalid_fraction, seed=2))
+    ops = operations(schema_id, valid, invalid)
+    selected = args.only or list(ops)
+
+    results: Dict[str, Dict[str, Any]] = {}
+    for driver_class in (InProcessDriver, ClientDriver):
+        if args.driver not in ("all", driver_class.name):
+            continue
+        driver = driver_class(main.app)
+        try:
+            results[driver.name] = {
+                name: await measure(driver, ops[name], args.iterations, args.warmup, args.alloc_samples)
+                for name in selected
+            }
+        finally:
+            await driver.close()
+    main.submission_store.close()
+
+    return {
+        "meta": {
+            "commit": _git_commit(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "store": os.environ.get("SUBMISSION_STORE_URL"),
+        },
+        "config": {
+            "categories": args.categories,
+            "params": args.params,
+            "enum_size": args.enum_size,
+            "dependent_depth": args.dependent_depth,
+            "regex_level": args.regex_level,
+            "invalid_fraction": args.invalid_fraction,
+            "schema_params": len(entry.plan.fields),
+            "schema_bytes": len(entry.serialized.body),
+            "submission_bytes": len(valid[0]),
+        },
+        "results": results,
+    }
+
+
+def compare(current: Dict[str, Any], baseline: Dict[str, Any]) -> Dict[str, Dict[str, float]]:
+    """Throughput and p99 ratios (current / baseline) for every shared benchmark."""
+    ratios: Dict[str, Dict[str, float]] = {}
+    for driver, ops in current["results"].items():
+        for name, result in ops.items():
+            base = baseline.get("results", {}).get(driver, {}).get(name)
+            if base:
+                ratios[f"{driver}.{name}"] = {
+                    "throughput": round(result["throughput_per_s"] / base["throughput_per_s"], 3),
+                    "p99": round(result["p99_us"] / base["p99_us"], 3),
+                }
+    return ratios
+
+
+def _git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True, text=True, check=True, cwd=os.path.dirname(os.path.abspath(__file__))
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--categories", type=int, default=4, help="Param categories (default 4)")
+    parser.add_argument("--params", type=int, default=10, help="Params per category (default 10)")
+    parser.add_argument("--enum-size", type=int, default=20, help="Options per enum (default 20)")
+    parser.add_argument("--dependent-depth", type=int, default=2, help="Dependent sub_lists per category (default 2)")
+    parser.add_argument("--regex-level", type=int, default=2, choices=range(len(REGEX_LEVELS)),
+                        help="Text pattern complexity, 0 (none) to 3 (default 2)")
+    parser.add_argument("--invalid-fraction", type=float, default=0.2,
+                        help="Share of fields made invalid in invalid submissions (default 0.2)")
+    parser.add_argument("--iterations", type=int, default=2000, help="Timed requests per benchmark")
+    parser.add_argument("--warmup", type=int, default=200, help="Untimed requests per benchmark")
+    parser.add_argument("--alloc-samples", type=int, default=100, help="Requests traced for allocations")
+    parser.add_argument("--driver", choices=["all", "inprocess", "client"], default="all")
+    parser.add_argument("--only", nargs="+", help="Benchmarks to run (default all)")
+    parser.add_argument("--store", default="memory://", help="SUBMISSION_STORE_URL (default memory://)")
+    parser.add_argument("--output", help="Write the JSON report to this file")
+    parser.add_argument("--compare", help="Baseline JSON report to compare against")
+    return parser.parse_args(argv)
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    os.environ["SUBMISSION_STORE_URL"] = args.store  # Read when main is imported
+    report = asyncio.run(run(args))
+    if args.compare:
+        with open(args.compare) as f:
+            report["comparison"] = compare(report, json.load(f))
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(output + "\n")
+    print(output)
@@ -0,0 +1,142 @@
+"""
+Field dependency graph for a form schema.
+Edges come from `related` and `dependsOn` (structural, must be acyclic)
+and from the field names used by x-visibility and rule conditions. Each
+field's transitive dependents are precomputed, so incremental validation
+only has to look up which fields a change can affect.
+"""
+
+from typing import Dict, FrozenSet, Iterable, List, Set, Tuple
+
+from expressions import compile_expression
+from models import FormSchema, Param
+
+
+def _as_list(value) -> List[str]:
+    if not value:
+        return []
+    return value if isinstance(value, list) else [value]
+
+
+def structural_parents(param: Param) -> List[str]:
+    """Parents named by a param's `related` and `dependsOn`, in declaration order."""
+    parents = _as_list(param.related) + _as_list(getattr(param.content, "dependsOn", None))
+    return list(dict.fromkeys(parents))
+
+
+def condition_parents(param: Param) -> Set[str]:
+    """Fields read by a param's visibility condition and conditional rules."""
+    names: Set[str] = set()
+    if param.x_visibility:
+        names |= compile_expression(param.x_visibility.condition).names
+    for rule in param.x_validation or []:
+        if rule.condition:
+            names |= compile_expression(rule.condition).names
+            names |= set(rule.fields or ())
+    names.discard(param.name)
+    return names
+
+
+class DependencyGraph:
+    """
+    Precomputed dependency index for one schema.
+
+    `order` is a topological order of the params (parents before children,
+    otherwise schema order). `dependents[name]` is every field whose
+    validation can change when `name` changes; `resets[name]` is every field
+    cleared by cascadeReset when `name` changes, transitively.
+    """
+    __slots__ = ("order", "parents", "dependents", "resets", "_position")
+
+    def __init__(self, schema: FormSchema):
+        params = [param for category in schema.paramCategories for param in category.params]
+        names = [param.name for param in params]
+
+        self.parents: Dict[str, Tuple[str, ...]] = {
+            param.name: tuple(structural_parents(param)) for param in params
+        }
+        for name, parents in self.parents.items():
+            for parent in parents:
+                if parent not in self.parents:
+                    raise ValueError(f"Parameter '{name}' depends on non-existent parameter '{parent}'")
+        self.order: Tuple[str, ...] = _topological_order(names, self.parents)
+        self._position = {name: i for i, name in enumerate(self.order)}
+
+        edges: Dict[str, Set[str]] = {name: set() for name in names}
+        reset_edges: Dict[str, Set[str]] = {name: set() for name in names}
+        for param in params:
+            for parent in self.parents[param.name]:
+                edges[parent].add(param.name)
+                if getattr(param.content, "cascadeReset", False):
+                    reset_edges[parent].add(param.name)
+            for parent in condition_parents(param):
+                if parent in edges:
+                    edges[parent].add(param.name)
+
+        self.dependents: Dict[str, FrozenSet[str]] = {
+            name: _reachable(name, edges) for name in names
+        }
+        self.resets: Dict[str, FrozenSet[str]] = {
+            name: _reachable(name, reset_edges) for name in names
+        }
+
+    def affected(self, changed: Iterable[str]) -> List[str]:
+        """Changed fields plus their transitive dependents, in topological order."""
+        fields: Set[str] = set()
+        for name in changed:
+            if name in self.dependents:
+                fields.add(name)
+                fields |= self.dependents[name]
+        return self.sorted(fields)
+
+    def reset(self, changed: Iterable[str]) -> List[str]:
+        """Fields cleared by cascadeReset when the given fields change."""
+        fields: Set[str] = set()
+        for name in changed:
+            fields |= self.resets.get(name, frozenset())
+        return self.sorted(fields)
+
+    def sorted(self, names: Iterable[str]) -> List[str]:
+        """Sort field names into topological order."""
+        return sorted(names, key=self._position.__getitem__)
+
+
+def _topological_order(names: List[str], parents: Dict[str, Tuple[str, ...]]) -> Tuple[str, ...]:
+    """Depth-first topological sort; raises ValueError naming a cycle."""
+    order: List[str] = []
+    state: Dict[str, int] = {}  # 1 = on the current path, 2 = done
+
+    def visit(name: str, path: List[str]) -> None:
+        if state.get(name) == 2:
+            return
+        if state.get(name) == 1:
+            cycle = path[path.index(name):] + [name]
+            raise ValueError(f"Dependency cycle: {' -> '.join(cycle)}")
+        state[name] = 1
+        for parent in parents.get(name, ()):
+            visit(parent, path + [name])
+        state[name] = 2
+        order.append(name)
+
+    for name in names:
+        visit(name, [])
+    return tuple(order)
+
+
+def _reachable(start: str, edges: Dict[str, Set[str]]) -> FrozenSet[str]:
+    seen: Set[str] = set()
+    stack = list(edges[start])
+    while stack:
+        name = stack.pop()
+        if name not in seen and name != start:
+            seen.add(name)
+            stack.extend(edges.get(name, ()))
+    return frozenset(seen)
+
+
+def build_dependency_graph(schema_id: str, schema: FormSchema) -> DependencyGraph:
+    """Build a schema's dependency graph, naming the schema in any error."""
+    try:
+        return DependencyGraph(schema)
+    except ValueError as e:
+        raise ValueError(f"Schema '{schema_id}': {e}") from None
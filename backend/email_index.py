@@ -0,0 +1,154 @@
+"""
+Email uniqueness index.
+An in-process Bloom filter of registered emails, used only to skip store
+lookups for emails that are certainly new. It is advisory: a "maybe" is
+confirmed against the submission store's unique values, and the filter is
+refreshed incrementally from the store's claim log so that emails
+registered through other workers are picked up.
+"""
+
+import hashlib
+import math
+import threading
+from typing import Callable, Dict, List, Tuple
+
+
+def normalize_email(email: str) -> str:
+    """Canonical form used for uniqueness checks."""
+    return email.lower()
+
+
+def fingerprint(email: str) -> int:
+    """64-bit fingerprint of a normalized email."""
+    digest = hashlib.blake2b(email.encode("utf-8"), digest_size=8).digest()
+    return int.from_bytes(digest, "little")
+
+
+# ============================================================================
+# Bloom Filter
+# ============================================================================
+
+class BloomFilter:
+    """
+    Bloom filter over 64-bit fingerprints.
+
+    Bit positions use double hashing on the two 32-bit halves of the
+    fingerprint.
+    """
+    __slots__ = ("capacity", "error_rate", "size", "hashes", "bits")
+
+    def __init__(self, capacity: int, error_rate: float = 0.01):
+        self.capacity = max(capacity, 1024)
+        self.error_rate = error_rate
+        self.size = math.ceil(-self.capacity * math.log(error_rate) / math.log(2) ** 2)
+        self.hashes = max(1, round(self.size / self.capacity * math.log(2)))
+        self.bits = bytearray((self.size + 7) // 8)
+
+    def _positions(self, fp: int) -> List[int]:
+        h1 = fp & 0xFFFFFFFF
+        h2 = (fp >> 32) | 1
+        size = self.size
+        return [(h1 + i * h2) % size for i in range(self.hashes)]
+
+    def add(self, fp: int) -> None:
+        bits = self.bits
+        for position in self._positions(fp):
+            bits[position >> 3] |= 1 << (position & 7)
+
+    def __contains__(self, fp: int) -> bool:
+        bits = self.bits
+        for position in self._positions(fp):
+            if not bits[position >> 3] & (1 << (position & 7)):
+                return False
+        return True
+
+
+# ============================================================================
+# Email Index
+# ============================================================================
+
+# Claim log entries fetched per store round trip when refreshing
+REFRESH_BATCH_SIZE = 10000
+
+
+class EmailIndex:
+    """
+    Advisory index of registered emails, kept as a Bloom filter only
+    (about 1.2 bytes per entry at a 1% error rate); the exact set lives in
+    the store.
+
+    might_contain() is False only for emails absent from the claim log as of
+    the last refresh, or claimed since by this process; until the first
+    refresh completes it is always True. Once the log outgrows the filter,
+    the next refresh rebuilds it at double the size from the log.
+    """
+
+    def __init__(self, capacity: int = 1 << 16, error_rate: float = 0.01):
+        self.error_rate = error_rate
+        self.ready = False
+        self._bloom = BloomFilter(capacity, error_rate)
+        self._lock = threading.Lock()
+        self._count = 0
+        self._cursor = 0
+
+    def __len__(self) -> int:
+        return self._count
+
+    def might_contain(self, email: str) -> bool:
+        """False if the email is certainly unregistered (as of the last refresh)."""
+        if not self.ready:
+            return True
+        return fingerprint(normalize_email(email)) in self._bloom
+
+    def add(self, email: str) -> None:
+        """Record an email claimed by this process, ahead of the next refresh."""
+        fp = fingerprint(normalize_email(email))
+        with self._lock:
+            self._bloom.add(fp)
+
+    def refresh(self, fetch: Callable[[int, int], List[Tuple[int, str]]]) -> int:
+        """
+        Add emails claimed since the last refresh. `fetch(after, limit)`
+        returns claim log entries as (sequence, email) pairs, e.g. a bound
+        SubmissionStore.unique_since. Returns the number of entries added.
+        """
+        added = 0
+        while True:
+            rows = fetch(self._cursor, REFRESH_BATCH_SIZE)
+            if not rows:
+                break
+            fps = [fingerprint(normalize_email(email)) for _, email in rows]
+            with self._lock:
+                for fp in fps:
+                    self._bloom.add(fp)
+                self._count += len(rows)
+                self._cursor = rows[-1][0]
+            added += len(rows)
+            if len(rows) < REFRESH_BATCH_SIZE:
+                break
+
+        if self._count > self._bloom.capacity:
+            self._rebuild(fetch)
+        self.ready = True
+        return added
+
+    def _rebuild(self, fetch: Callable[[int, int], List[Tuple[int, str]]]) -> None:
+        """Reload the whole claim log into a filter sized for twice its length."""
+        index = EmailIndex(self._count * 2, self.error_rate)
+        index.refresh(fetch)
+        with self._lock:
+            self._bloom = index._bloom
+            self._count = index._count
+            self._cursor = index._cursor
+
+    def stats(self) -> Dict[str, float]:
+        """Entry count and memory use."""
+        bloom_bytes = len(self._bloom.bits)
+        entries = self._count
+        return {
+            "ready": self.ready,
+            "entries": entries,
+            "bloom_bytes": bloom_bytes,
+            "bloom_hashes": self._bloom.hashes,
+            "bytes_per_entry": round(bloom_bytes / entries, 1) if entries else 0.0,
+        }
@@ -0,0 +1,102 @@
+"""
+Streaming export of stored submissions.
+Each format is a generator over the store's paged iterator, so exports start
+immediately and never materialise the full result set.
+"""
+
+import csv
+import io
+import json
+from typing import Any, Iterable, Iterator, List
+
+from models import FormSchema
+from storage import SubmissionRecord
+
+
+# Record metadata columns that precede the schema's param columns
+META_COLUMNS = ["submissionId", "timestamp", "schemaVersion"]
+
+# Media type per export format
+EXPORT_MEDIA_TYPES = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv; charset=utf-8",
+    "columnar": "application/x-ndjson",
+}
+
+
+def schema_columns(schema: FormSchema) -> List[str]:
+    """Param names in paramCategories order."""
+    return [param.name for category in schema.paramCategories for param in category.params]
+
+
+def _cell(value: Any) -> Any:
+    """Flatten a data value for a tabular cell; lists and objects become JSON."""
+    if isinstance(value, (list, dict)):
+        return json.dumps(value, ensure_ascii=False, separators=(",", ":"))
+    return value
+
+
+# ============================================================================
+# Export Formats
+# ============================================================================
+
+def iter_ndjson(records: Iterable[SubmissionRecord]) -> Iterator[bytes]:
+    """One full submission record per line."""
+    for record in records:
+        yield json.dumps(record, ensure_ascii=False, separators=(",", ":")).encode("utf-8") + b"\n"
+
+
+def iter_csv(records: Iterable[SubmissionRecord], columns: List[str], chunk_size: int = 1000) -> Iterator[bytes]:
+    """CSV with a header row, flushed every `chunk_size` rows."""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(META_COLUMNS + columns)
+
+    rows = 0
+    for record in records:
+        data = record["data"]
+        writer.writerow(
+            [record["submissionId"], record["timestamp"], record.get("schemaVersion") or ""]
+            + [_cell(data.get(column)) for column in columns]
+        )
+        rows += 1
+        if rows == chunk_size:
+            yield buffer.getvalue().encode("utf-8")
+            buffer.seek(0)
+            buffer.truncate()
+            rows = 0
+
+    if buffer.tell():
+        yield buffer.getvalue().encode("utf-8")
+
+
+def iter_columnar(records: Iterable[SubmissionRecord], columns: List[str], chunk_size: int = 1000) -> Iterator[bytes]:
+    """
+    Column-oriented chunks as NDJSON, like Parquet row groups.
+
+    The first line is a header {"columns": [...]}; every following line is a
+    chunk {"rows": n, "columns": {name: [values...]}} of up to `chunk_size` rows.
+    """
+    all_columns = META_COLUMNS + columns
+    yield json.dumps({"columns": all_columns}, separators=(",", ":")).encode("utf-8") + b"\n"
+
+    def new_chunk():
+        return {column: [] for column in all_columns}
+
+    chunk = new_chunk()
+    rows = 0
+    for record in records:
+        data = record["data"]
+        chunk["submissionId"].append(record["submissionId"])
+        chunk["timestamp"].append(record["timestamp"])
+        chunk["schemaVersion"].append(record.get("schemaVersion"))
+        for column in columns:
+            chunk[column].append(data.get(column))
+        rows += 1
+        if rows == chunk_size:
+            yield json.dumps({"rows": rows, "columns": chunk}, ensure_ascii=False, separators=(",", ":")).encode("utf-8") + b"\n"
+            chunk = new_chunk()
+            rows = 0
+
+    if rows:
+        yield json.dumps({"rows": rows, "columns": chunk}, ensure_ascii=False, separators=(",", ":")).encode("utf-8") + b"\n"
@@ -0,0 +1,179 @@
+"""
+Safe condition expressions for x-visibility and cross-field validation rules.
+Conditions such as "country == 'US'" or "date_end > date_start" are parsed
+once with the Python grammar, checked against a small whitelist of node
+types and compiled into nested closures over the submission data; nothing
+is ever passed to eval.
+"""
+
+import ast
+import operator
+from functools import lru_cache
+from typing import Any, Callable, Dict, FrozenSet, Set
+
+# Compiled node: evaluates against submission data
+Evaluator = Callable[[Dict[str, Any]], Any]
+
+# Bare names that are literals rather than field references
+_CONSTANTS = {
+    "true": True, "True": True,
+    "false": False, "False": False,
+    "null": None, "None": None,
+}
+
+_COMPARISONS = {
+    ast.Eq: operator.eq,
+    ast.NotEq: operator.ne,
+    ast.Lt: operator.lt,
+    ast.LtE: operator.le,
+    ast.Gt: operator.gt,
+    ast.GtE: operator.ge,
+    ast.In: lambda a, b: a in b,
+    ast.NotIn: lambda a, b: a not in b,
+    ast.Is: operator.is_,
+    ast.IsNot: operator.is_not,
+}
+
+_UNARY = {
+    ast.Not: operator.not_,
+    ast.USub: operator.neg,
+    ast.UAdd: operator.pos,
+}
+
+_BINARY = {
+    ast.Add: operator.add,
+    ast.Sub: operator.sub,
+    ast.Mult: operator.mul,
+    ast.Div: operator.truediv,
+    ast.Mod: operator.mod,
+}
+
+
+class Expression:
+    """
+    A compiled condition. Calling it with submission data returns the
+    condition's truth value; missing fields read as None, and comparisons
+    between incompatible types or arithmetic that fails (division by zero,
+    float overflow) are false rather than errors.
+    """
+    __slots__ = ("source", "names", "_evaluate")
+
+    def __init__(self, source: str, names: FrozenSet[str], evaluate: Evaluator):
+        self.source = source
+        self.names = names
+        self._evaluate = evaluate
+
+    def __call__(self, data: Dict[str, Any]) -> bool:
+        try:
+            return bool(self._evaluate(data))
+        except (TypeError, ValueError, ZeroDivisionError, OverflowError):
+            return False
+
+    def __repr__(self) -> str:
+        return f"Expression({self.source!r})"
+
+
+@lru_cache(maxsize=1024)
+def compile_expression(source: str) -> Expression:
+    """
+    Compile a condition string, raising ValueError if it is not valid
+    syntax or uses anything beyond field names, literals, comparisons,
+    and/or/not and arithmetic.
+    """
+    try:
+        tree = ast.parse(source.strip(), mode="eval")
+    except SyntaxError as e:
+        raise ValueError(f"Invalid condition {source!r}: {e.msg}") from None
+
+    names: Set[str] = set()
+    try:
+        evaluate = _compile(tree.body, names)
+    except ValueError as e:
+        raise ValueError(f"Invalid condition {source!r}: {e}") from None
+    return Expression(source, frozenset(names), evaluate)
+
+
+# ============================================================================
+# Node Compilers
+# ============================================================================
+
+def _compile(node: ast.AST, names: Set[str]) -> Evaluator:
+    if isinstance(node, ast.Constant):
+        if not isinstance(node.value, (str, int, float, bool, type(None))):
+            raise ValueError(f"unsupported literal {node.value!r}")
+        value = node.value
+        return lambda data: value
+
+    if isinstance(node, ast.Name):
+        if node.id in _CONSTANTS:
+            value = _CONSTANTS[node.id]
+            return lambda data: value
+        name = node.id
+        names.add(name)
+        return lambda data: data.get(name)
+
+    if isinstance(node, (ast.List, ast.Tuple, ast.Set)):
+        items = [_compile(item, names) for item in node.elts]
+        if all(isinstance(item, ast.Constant) for item in node.elts):
+            values = frozenset(item.value for item in node.elts) if isinstance(node, ast.Set) else tuple(
+                item.value for item in node.elts
+            )
+            return lambda data: values
+        return lambda data: [item(data) for item in items]
+
+    if isinstance(node, ast.BoolOp):
+        # Fold into nested two-operand closures; short-circuits like Python
+        operands = [_compile(value, names) for value in node.values]
+        combined = operands[-1]
+        for operand in reversed(operands[:-1]):
+            if isinstance(node.op, ast.And):
+                combined = (lambda a, b: lambda data: a(data) and b(data))(operand, combined)
+            else:
+                combined = (lambda a, b: lambda data: a(data) or b(data))(operand, combined)
+        return combined
+
+    if isinstance(node, ast.UnaryOp) and type(node.op) in _UNARY:
+        op = _UNARY[type(node.op)]
+        operand = _compile(node.operand, names)
+        return lambda data: op(operand(data))
+
+    if isinstance(node, ast.BinOp) and type(node.op) in _BINARY:
+        op = _BINARY[type(node.op)]
+        left = _compile(node.left, names)
+        right = _compile(node.right, names)
+
+        # Numbers only, so submitted strings and lists can't be multiplied up
+        def arithmetic(data: Dict[str, Any]) -> Any:
+            a, b = left(data), right(data)
+            if not isinstance(a, (int, float)) or not isinstance(b, (int, float)):
+                raise TypeError("arithmetic on non-numbers")
+            return op(a, b)
+
+        return arithmetic
+
+    if isinstance(node, ast.Compare):
+        return _compile_compare(node, names)
+
+    raise ValueError(f"unsupported syntax {type(node).__name__}")
+
+
+def _compile_compare(node: ast.Compare, names: Set[str]) -> Evaluator:
+    for op in node.ops:
+        if type(op) not in _COMPARISONS:
+            raise ValueError(f"unsupported comparison {type(op).__name__}")
+    left = _compile(node.left, names)
+
+    if len(node.ops) == 1:
+        op = _COMPARISONS[type(node.ops[0])]
+        right = _compile(node.comparators[0], names)
+        return lambda data: op(left(data), right(data))
+
+    # Chained comparison (a < b < c): every link must hold
+    ops = [_COMPARISONS[type(op)] for op in node.ops]
+    operands = [left] + [_compile(comparator, names) for comparator in node.comparators]
+
+    def compare_chain(data: Dict[str, Any]) -> bool:
+        values = [operand(data) for operand in operands]
+        return all(op(values[i], values[i + 1]) for i, op in enumerate(ops))
+
+    return compare_chain
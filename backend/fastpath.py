@@ -0,0 +1,127 @@
+"""
+Lean request path for single-submission validation and submission.
+The raw JSON body is parsed once into plain Python objects and validated
+directly against the compiled plan, and responses are assembled from error
+JSON serialized once per distinct error. FormSubmission and the response
+models stay the public contract: bodies that are not a well-formed
+submission are re-parsed by pydantic, so clients get the usual 422 errors.
+"""
+
+import json
+from typing import Dict, List, Tuple
+
+from fastapi.exceptions import RequestValidationError
+from pydantic import ValidationError as PydanticValidationError
+
+from models import FormSubmission, ValidationError
+
+
+# Message of a FormSubmissionResponse for a form that failed validation
+VALIDATION_FAILED_MESSAGE = "Form validation failed"
+
+# Distinct error templates kept before the cache is cleared
+MAX_ERROR_TEMPLATES = 4096
+
+# OpenAPI schema of a FormSubmission, for endpoints that parse bodies themselves
+# (inlined, since no route declares the model as its body any more)
+SUBMISSION_SCHEMA = FormSubmission.model_json_schema()
+
+SUBMISSION_REQUEST_BODY = {
+    "requestBody": {
+        "required": True,
+        "content": {"application/json": {"schema": SUBMISSION_SCHEMA}},
+    }
+}
+
+_VALID = b'{"valid":true,"errors":[]}'
+_INVALID = b'{"valid":false,"errors":[%s]}'
+_SUBMISSION_FAILED = (
+    b'{"success":false,"message":%s,"data":{"errors":[%%s]}}'
+    % json.dumps(VALIDATION_FAILED_MESSAGE).encode("utf-8")
+)
+
+# Serialized ValidationError by (field, message, code); errors returned by
+# worker processes are copies, so the key is the content, not the object
+_ERROR_JSON: Dict[Tuple[str, str, str], bytes] = {}
+
+_OPTIONAL_STR = (str, type(None))
+
+# Error FastAPI reports for an empty or null body on a required body parameter
+_MISSING_BODY = {"type": "missing", "loc": ("body",), "msg": "Field required", "input": None}
+
+
+def parse_submission(body: bytes) -> FormSubmission:
+    """
+    Parse a FormSubmission body. Well-formed bodies skip model validation;
+    anything else goes through pydantic and raises RequestValidationError.
+    """
+    if not body:
+        raise RequestValidationError([_MISSING_BODY])
+    try:
+        content = json.loads(body)
+    except json.JSONDecodeError as e:
+        # Same error FastAPI reports for an unparseable body
+        raise RequestValidationError([{
+            "type": "json_invalid",
+            "loc": ("body", e.pos),
+            "msg": "JSON decode error",
+            "input": {},
+            "ctx": {"error": e.msg},
+        }])
+    except UnicodeDecodeError as e:
+        raise RequestValidationError([{
+            "type": "json_invalid",
+            "loc": ("body", e.start),
+            "msg": "JSON decode error",
+            "input": {},
+            "ctx": {"error": f"Invalid {e.encoding} encoding: {e.reason}"},
+        }])
+    except RecursionError:
+        raise RequestValidationError([{
+            "type": "json_invalid",
+            "loc": ("body",),
+            "msg": "JSON nested too deeply",
+            "input": {},
+        }])
+
+    if content is None:
+        raise RequestValidationError([_MISSING_BODY])
+
+    if type(content) is dict and type(content.get("data")) is dict:
+        form_id = content.get("formId")
+        schema_version = content.get("schemaVersion")
+        if type(form_id) in _OPTIONAL_STR and type(schema_version) in _OPTIONAL_STR:
+            return FormSubmission.model_construct(
+                formId=form_id, schemaVersion=schema_version, data=content["data"]
+            )
+
+    try:
+        return FormSubmission.model_validate(content, from_attributes=True)
+    except PydanticValidationError as e:
+        raise RequestValidationError([
+            {**error, "loc": ("body",) + tuple(error["loc"])}
+            for error in e.errors(include_url=False)
+        ])
+
+
+def error_json(error: ValidationError) -> bytes:
+    """Serialized form of a validation error, cached by content."""
+    key = (error.field, error.message, error.code)
+    encoded = _ERROR_JSON.get(key)
+    if encoded is None:
+        if len(_ERROR_JSON) >= MAX_ERROR_TEMPLATES:
+            _ERROR_JSON.clear()
+        encoded = _ERROR_JSON[key] = error.model_dump_json().encode("utf-8")
+    return encoded
+
+
+def validation_response_json(errors: List[ValidationError]) -> bytes:
+    """FormValidationResponse JSON for a list of errors."""
+    if not errors:
+        return _VALID
+    return _INVALID % b",".join(map(error_json, errors))
+
+
+def submission_failed_json(errors: List[ValidationError]) -> bytes:
+    """FormSubmissionResponse JSON for a submission that failed validation."""
+    return _SUBMISSION_FAILED % b",".join(map(error_json, errors))
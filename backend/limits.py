@@ -0,0 +1,165 @@
+"""
+Request size limits for single-submission endpoints.
+Each schema version gets a byte budget, the set of allowed data keys and
+the nesting depth each value may have, all derived from its params. The
+body is read chunk by chunk and rejected as soon as it exceeds the budget,
+so oversized payloads are never buffered in full or parsed.
+"""
+
+import re
+from typing import Any, Callable, Dict, List, Optional
+
+from fastapi import HTTPException, Request
+from fastapi.exceptions import RequestValidationError
+
+from models import FormSchema, Param
+from validation import is_multiple
+
+
+# Hard cap on a submission body, whatever the schema
+DEFAULT_MAX_BODY_BYTES = 1024 * 1024
+
+# Budget for a value whose size the schema does not bound (string without
+# maxLength, options loaded from a source endpoint)
+UNBOUNDED_FIELD_BYTES = 64 * 1024
+
+# Encoded size bounds per scalar kind
+_NUMBER_BYTES = 32
+_DATE_BYTES = 64
+_BOOLEAN_BYTES = 5
+
+# Bytes per character of a bounded string (UTF-8 worst case)
+_CHAR_BYTES = 4
+
+# Read this much of a body before looking for a leading formId
+_PEEK_BYTES = 256
+
+_LEADING_FORM_ID = re.compile(rb'^\s*\{\s*"formId"\s*:\s*"([A-Za-z0-9_-]{1,128})"')
+
+
+class BodyLimits:
+    """
+    Size limits for one schema version. `max_bytes` is twice the largest
+    body a valid submission can encode, plus 1 KiB for the envelope and
+    whitespace; `fields` maps each allowed data key to the nesting depth
+    its value may have (0 for scalars, 1 for lists of scalars).
+    """
+    __slots__ = ("max_bytes", "fields")
+
+    def __init__(self, schema: FormSchema):
+        params = [param for category in schema.paramCategories for param in category.params]
+        self.fields: Dict[str, int] = {param.name: _value_depth(param) for param in params}
+        payload = sum(len(param.name) + 4 + _value_bytes(param) for param in params)
+        self.max_bytes = 2 * payload + 1024
+
+    def check(self, data: Dict[str, Any]) -> None:
+        """Raise RequestValidationError for unknown keys and over-nested values."""
+        errors: List[Dict[str, Any]] = []
+        fields = self.fields
+        for key, value in data.items():
+            depth = fields.get(key)
+            if depth is None:
+                errors.append({
+                    "type": "extra_forbidden",
+                    "loc": ("body", "data", key),
+                    "msg": "Unknown field",
+                    "input": None,
+                })
+            elif type(value) in (list, dict) and _too_deep(value, depth):
+                errors.append({
+                    "type": "too_deep",
+                    "loc": ("body", "data", key),
+                    "msg": "Value is nested too deeply",
+                    "input": None,
+                })
+        if errors:
+            raise RequestValidationError(errors)
+
+
+def _value_depth(param: Param) -> int:
+    content = param.content
+    return 1 if is_multiple(param) or content.type == "number_range" else 0
+
+
+def _option_bytes(values) -> int:
+    return max((len(option.value) for option in values), default=0) * _CHAR_BYTES + 2
+
+
+def _value_bytes(param: Param) -> int:
+    """Largest encoded size of a valid value for a param."""
+    content = param.content
+    if content.type == "string":
+        return content.maxLength * _CHAR_BYTES + 2 if content.maxLength is not None else UNBOUNDED_FIELD_BYTES
+    if content.type in ("number", "integer"):
+        return _NUMBER_BYTES
+    if content.type == "number_range":
+        return 2 * _NUMBER_BYTES + 3
+    if content.type in ("date", "datetime", "time"):
+        return _DATE_BYTES
+    if content.type == "boolean":
+        return _BOOLEAN_BYTES
+    if content.type == "enum" and content.values:
+        option = _option_bytes(content.values)
+        if is_multiple(param):
+            return (option + 1) * (content.maxSelections or len(content.values)) + 2
+        return option
+    if content.type == "dependent_enum" and content.mapping and not is_multiple(param):
+        return max(_option_bytes(values) for values in content.mapping.values())
+    return UNBOUNDED_FIELD_BYTES
+
+
+def _too_deep(value: Any, remaining: int) -> bool:
+    if type(value) is list:
+        items = value
+    elif type(value) is dict:
+        items = value.values()
+    else:
+        return False
+    if remaining == 0:
+        return True
+    return any(_too_deep(item, remaining - 1) for item in items)
+
+
+def _too_large(limit: int) -> HTTPException:
+    return HTTPException(status_code=413, detail=f"Request body exceeds {limit} bytes")
+
+
+async def read_limited_body(
+    request: Request,
+    max_bytes: int,
+    budget: Callable[[Optional[str]], int]
+) -> bytes:
+    """
+    Read a submission body, stopping with 413 once it exceeds its limit.
+
+    The limit is `max_bytes` until the form is known: `budget(form_id)`
+    gives the form's byte budget, looked up as soon as a leading formId
+    (the usual `{"formId": ..., "data": ...}` order) has arrived. Bodies
+    that name the form later are held to `max_bytes` while reading and
+    should be checked against the form's budget after parsing.
+    """
+    declared = request.headers.get("content-length", "")
+    if declared.isdigit() and int(declared) > max_bytes:
+        raise _too_large(max_bytes)
+
+    limit = max_bytes
+    peeked = False
+    body = bytearray()
+    async for chunk in request.stream():
+        body += chunk
+        if not peeked and len(body) >= _PEEK_BYTES:
+            peeked = True
+            match = _LEADING_FORM_ID.match(body)
+            if match:
+                limit = min(max_bytes, budget(match.group(1).decode("ascii")))
+                if declared.isdigit() and int(declared) > limit:
+                    raise _too_large(limit)
+        if len(body) > limit:
+            raise _too_large(limit)
+    return bytes(body)
+
+
+def check_body_size(body: bytes, limit: int) -> None:
+    """Reject a fully read body over its form's budget."""
+    if len(body) > limit:
+        raise _too_large(limit)
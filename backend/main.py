@@ -3,23 +3,67 @@ FastAPI backend for Dynamic Form System.
 Provides endpoints for form schemas, validation, and submission.
 """
 
-from fastapi import FastAPI, HTTPException, Query
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, HTTPException, Query, Request
+from fastapi.concurrency import run_in_threadpool
+from fastapi.exceptions import RequestValidationError
 from fastapi.middleware.cors import CORSMiddleware
-from typing import Dict, Any, List, Optional
-import re
+from fastapi.responses import JSONResponse, PlainTextResponse, Response, StreamingResponse
+from pydantic import TypeAdapter, ValidationError as PydanticValidationError
+from typing import Dict, Any, List, Literal, Optional
+from collections import deque
+from functools import partial
+from time import perf_counter
+import asyncio
+import os
 
 from models import (
     FormSchema, FormSubmission, FormValidationResponse,
-    FormSubmissionResponse, ValidationError, EnumValue
+    FormSubmissionResponse, ValidationError, EnumValue,
+    BatchValidationResponse, SubmissionPage,
+    IncrementalValidationRequest, IncrementalValidationResponse
 )
 from example_schemas import SCHEMA_REGISTRY
+from async_validation import SingleFlightCache
+from email_index import EmailIndex, normalize_email
+from export import EXPORT_MEDIA_TYPES, iter_columnar, iter_csv, iter_ndjson, schema_columns
+from limits import DEFAULT_MAX_BODY_BYTES, check_body_size, read_limited_body
+from metrics import DEFAULT_SAMPLE_RATE, PROMETHEUS_CONTENT_TYPE, Metrics, MetricsMiddleware
+from fastpath import (
+    SUBMISSION_REQUEST_BODY, SUBMISSION_SCHEMA, VALIDATION_FAILED_MESSAGE,
+    parse_submission, submission_failed_json, validation_response_json
+)
+from options import COUNTRIES, CITIES_BY_COUNTRY, SUBCATEGORIES_BY_PARENT, OptionSource
+from patterns import PATTERN_CACHE, PatternTimeout
+from registry import DEFAULT_VERSION_HISTORY, SchemaLoadError, SchemaRegistry, SchemaVersionUnavailable
+from storage import SubmissionStore, TimedSubmissionStore, create_store, parse_filter
+from streaming import DuplexStreamingResponse, MAX_RECORD_BYTES, iter_ndjson_records
+from workers import DEFAULT_OFFLOAD_BYTES, ValidationPool
 
 
 # ============================================================================
 # FastAPI Application Setup
 # ============================================================================
 
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """
+    Start validation workers, the schema watcher and the email index
+    refresher; flush pending writes on shutdown.
+    """
+    validation_pool.start()
+    watcher = asyncio.create_task(watch_schemas()) if SCHEMA_DIR else None
+    email_refresher = asyncio.create_task(refresh_email_index())
+    yield
+    if watcher is not None:
+        watcher.cancel()
+    email_refresher.cancel()
+    validation_pool.close()
+    submission_store.close()
+
+
 app = FastAPI(
+    lifespan=lifespan,
     title="Dynamic Form API",
     description="API for dynamic form schema delivery and submission",
     version="1.0.0",
@@ -39,18 +83,143 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Schema-Version"],
 )
 
+# Request, validation and storage latency, served at /api/metrics ("0" disables)
+METRICS_ENABLED = os.environ.get("METRICS_ENABLED", "1") != "0"
+# Share of validations profiled check by check
+METRICS_SAMPLE_RATE = float(os.environ.get("METRICS_SAMPLE_RATE", str(DEFAULT_SAMPLE_RATE)))
+
+metrics = Metrics(METRICS_SAMPLE_RATE if METRICS_ENABLED else 0)
+if METRICS_ENABLED:
+    app.add_middleware(MetricsMiddleware, metrics=metrics)
+
 
 # ============================================================================
-# In-Memory Data Store (Replace with database in production)
+# Data Store
 # ============================================================================
 
-# Simulated database for submitted forms
-submitted_forms: List[Dict[str, Any]] = []
+# Submission storage ("sqlite:///path/to/file.db" or "memory://")
+SUBMISSION_STORE_URL = os.environ.get("SUBMISSION_STORE_URL", "sqlite:///submissions.db")
 
-# Simulated database for email validation
-registered_emails = {"test@example.com", "admin@example.com"}
+submission_store: SubmissionStore = create_store(SUBMISSION_STORE_URL)
+if METRICS_ENABLED:
+    submission_store = TimedSubmissionStore(submission_store, metrics.storage.observe)
+
+# Registered emails: the store's unique values are authoritative; the
+# in-process index only lets lookups for new emails skip the store
+email_index = EmailIndex()
+for _email in ("test@example.com", "admin@example.com"):
+    submission_store.claim_unique("email", _email)
+
+# Seconds between email index refreshes from the store's claim log; emails
+# registered through other workers may read as available for this long
+EMAIL_INDEX_REFRESH_INTERVAL = float(os.environ.get("EMAIL_INDEX_REFRESH_INTERVAL", "1.0"))
+
+# Single-flight, short-TTL cache for the store lookups behind async validation
+# rules, keyed by (rule, value)
+ASYNC_VALIDATION_CACHE = SingleFlightCache(ttl=2.0)
+
+# Error returned when a registration email has already been claimed
+EMAIL_TAKEN_ERROR = ValidationError(
+    field="email",
+    message="This email is already registered",
+    code="unique_email"
+)
+
+
+# ============================================================================
+# Schema Registry
+# ============================================================================
+
+# Directory of <schema_id>.json/.yaml schema files, polled for changes
+SCHEMA_DIR = os.environ.get("SCHEMA_DIR")
+SCHEMA_POLL_INTERVAL = float(os.environ.get("SCHEMA_POLL_INTERVAL", "2.0"))
+
+# Compiled versions kept per form for submissions pinned to older versions
+SCHEMA_VERSION_HISTORY = int(os.environ.get("SCHEMA_VERSION_HISTORY", str(DEFAULT_VERSION_HISTORY)))
+
+# Built-in and file-backed schemas, compiled (plan, dependency graph,
+# serialized response) on first access and hot-swapped when files change
+schema_registry = SchemaRegistry(SCHEMA_REGISTRY, SCHEMA_DIR, SCHEMA_VERSION_HISTORY)
+
+# Worker processes for large submissions ("0" validates everything inline)
+VALIDATION_WORKERS = int(os.environ.get("VALIDATION_WORKERS", "0"))
+VALIDATION_OFFLOAD_BYTES = int(os.environ.get("VALIDATION_OFFLOAD_BYTES", str(DEFAULT_OFFLOAD_BYTES)))
+
+validation_pool = ValidationPool(
+    schema_registry,
+    workers=VALIDATION_WORKERS,
+    offload_bytes=VALIDATION_OFFLOAD_BYTES
+)
+
+
+async def watch_schemas() -> None:
+    """Poll the schema directory and swap in changed schemas."""
+    while True:
+        await asyncio.sleep(SCHEMA_POLL_INTERVAL)
+        await run_in_threadpool(schema_registry.refresh)
+
+
+async def refresh_email_index() -> None:
+    """Load the email index in the background, then keep it in step with the store."""
+    while True:
+        try:
+            await run_in_threadpool(email_index.refresh, partial(submission_store.unique_since, "email"))
+        except Exception:
+            pass  # Store unavailable; lookups still reach it, retry on the next poll
+        await asyncio.sleep(EMAIL_INDEX_REFRESH_INTERVAL)
+
+
+@app.exception_handler(SchemaLoadError)
+async def schema_load_error_handler(request: Request, exc: SchemaLoadError):
+    """A schema file exists but is invalid: fail requests for that form only."""
+    return JSONResponse(status_code=503, content={"detail": str(exc)})
+
+
+@app.exception_handler(SchemaVersionUnavailable)
+async def schema_version_handler(request: Request, exc: SchemaVersionUnavailable):
+    """A submission is pinned to a version no longer kept: the client must reload the form."""
+    return JSONResponse(status_code=409, content={"detail": str(exc), "currentVersion": exc.current})
+
+
+def pin_schema_version(submission: FormSubmission) -> FormSubmission:
+    """
+    Resolve the schema version a submission is validated against, so that
+    validation and the stored record agree even if the schema is swapped
+    in between.
+    """
+    entry = schema_registry.get(submission.formId, submission.schemaVersion) if submission.formId else None
+    if entry is None or entry.version == submission.schemaVersion:
+        return submission
+    return submission.model_copy(update={"schemaVersion": entry.version})
+
+
+# ============================================================================
+# Option Sources
+# ============================================================================
+
+# Option lists for the dynamic data endpoints, serialized once per parent
+# value; cache settings come from the loaded schemas that reference them
+COUNTRY_OPTIONS = OptionSource("/api/countries", {None: COUNTRIES})
+CITY_OPTIONS = OptionSource("/api/cities", CITIES_BY_COUNTRY)
+SUBCATEGORY_OPTIONS = OptionSource("/api/subcategories", SUBCATEGORIES_BY_PARENT)
+
+OPTION_SOURCES = (COUNTRY_OPTIONS, CITY_OPTIONS, SUBCATEGORY_OPTIONS)
+
+
+def configure_option_sources(schemas: List[FormSchema]) -> None:
+    """Apply cache settings from the schemas the registry currently holds."""
+    for source in OPTION_SOURCES:
+        source.configure(schemas)
+
+
+# Settings follow schemas as they are loaded or swapped, without loading any
+schema_registry.on_change(configure_option_sources)
+
+# Email format pattern for the async uniqueness check
+EMAIL_PATTERN = PATTERN_CACHE.get(r"^[^@]+@[^@]+\.[^@]+$")
 
 
 # ============================================================================
@@ -64,7 +233,7 @@ async def root():
         "name": "Dynamic Form API",
         "version": "1.0.0",
         "documentation": "/api/docs",
-        "available_schemas": list(SCHEMA_REGISTRY.keys())
+        "available_schemas": schema_registry.ids()
     }
 
 
@@ -73,20 +242,28 @@ async def list_schemas():
     """List all available form schemas."""
     return {
         schema_id: f"/api/schemas/{schema_id}"
-        for schema_id in SCHEMA_REGISTRY.keys()
+        for schema_id in schema_registry.ids()
     }
 
 
 @app.get("/api/schemas/{schema_id}", tags=["Schemas"], response_model=FormSchema)
-async def get_schema(schema_id: str):
-    """Get a specific form schema by ID."""
-    if schema_id not in SCHEMA_REGISTRY:
+async def get_schema(
+    schema_id: str,
+    request: Request,
+    version: Optional[str] = Query(None, description="Schema version (X-Schema-Version); defaults to the current one")
+):
+    """
+    Get a specific form schema by ID (supports If-None-Match and gzip/br).
+    The X-Schema-Version header carries the version to submit with the form.
+    """
+    entry = schema_registry.get(schema_id, version)
+    if entry is None:
         raise HTTPException(
             status_code=404,
-            detail=f"Schema '{schema_id}' not found. Available schemas: {list(SCHEMA_REGISTRY.keys())}"
+            detail=f"Schema '{schema_id}' not found. Available schemas: {schema_registry.ids()}"
         )
     
-    return SCHEMA_REGISTRY[schema_id]
+    return entry.serialized.respond(request)
 
 
 # ============================================================================
@@ -94,80 +271,69 @@ async def get_schema(schema_id: str):
 # ============================================================================
 
 @app.get("/api/countries", tags=["Data"], response_model=List[EnumValue])
-async def get_countries():
+async def get_countries(
+    request: Request,
+    q: Optional[str] = Query(None, description="Search text (label or value)"),
+    limit: int = Query(50, ge=1, le=500, description="Page size when searching"),
+    offset: int = Query(0, ge=0, description="Page offset when searching")
+):
     """Get list of countries (example dynamic data endpoint)."""
-    return [
-        EnumValue(label="United Kingdom", value="GB"),
-        EnumValue(label="United States", value="US"),
-        EnumValue(label="Canada", value="CA"),
-        EnumValue(label="Australia", value="AU"),
-        EnumValue(label="Germany", value="DE"),
-        EnumValue(label="France", value="FR"),
-    ]
+    if q is not None:
+        return COUNTRY_OPTIONS.search(None, q, offset, limit)
+    return COUNTRY_OPTIONS.response().respond(request)
 
 
 @app.get("/api/cities", tags=["Data"], response_model=List[EnumValue])
-async def get_cities(country: str = Query(..., description="Country code")):
+async def get_cities(
+    request: Request,
+    country: str = Query(..., description="Country code"),
+    q: Optional[str] = Query(None, description="Search text (label or value)"),
+    limit: int = Query(50, ge=1, le=500, description="Page size when searching"),
+    offset: int = Query(0, ge=0, description="Page offset when searching")
+):
     """Get cities for a specific country (example dependent data)."""
-    cities_by_country = {
-        "GB": [
-            EnumValue(label="London", value="london"),
-            EnumValue(label="Manchester", value="manchester"),
-            EnumValue(label="Birmingham", value="birmingham"),
-            EnumValue(label="Edinburgh", value="edinburgh"),
-        ],
-        "US": [
-            EnumValue(label="New York", value="new_york"),
-            EnumValue(label="Los Angeles", value="los_angeles"),
-            EnumValue(label="Chicago", value="chicago"),
-            EnumValue(label="Houston", value="houston"),
-        ],
-        "CA": [
-            EnumValue(label="Toronto", value="toronto"),
-            EnumValue(label="Vancouver", value="vancouver"),
-            EnumValue(label="Montreal", value="montreal"),
-        ],
-    }
-    
-    return cities_by_country.get(country, [])
+    if q is not None:
+        return CITY_OPTIONS.search(country, q, offset, limit)
+    return CITY_OPTIONS.response(country).respond(request)
 
 
 @app.get("/api/subcategories", tags=["Data"], response_model=List[EnumValue])
-async def get_subcategories(parent: str = Query(..., description="Parent category")):
+async def get_subcategories(
+    request: Request,
+    parent: str = Query(..., description="Parent category"),
+    q: Optional[str] = Query(None, description="Search text (label or value)"),
+    limit: int = Query(50, ge=1, le=500, description="Page size when searching"),
+    offset: int = Query(0, ge=0, description="Page offset when searching")
+):
     """Get subcategories based on parent category."""
-    subcategories = {
-        "electronics": [
-            EnumValue(label="Laptops", value="laptops"),
-            EnumValue(label="Phones", value="phones"),
-            EnumValue(label="Tablets", value="tablets"),
-        ],
-        "clothing": [
-            EnumValue(label="Men", value="men"),
-            EnumValue(label="Women", value="women"),
-            EnumValue(label="Children", value="children"),
-        ],
-    }
-    
-    return subcategories.get(parent, [])
+    if q is not None:
+        return SUBCATEGORY_OPTIONS.search(parent, q, offset, limit)
+    return SUBCATEGORY_OPTIONS.response(parent).respond(request)
 
 
 # ============================================================================
 # Validation Endpoints
 # ============================================================================
 
-@app.get("/api/validate/email", tags=["Validation"])
-async def validate_email(email: str = Query(..., description="Email to validate")):
-    """Validate if email is unique (async validation example)."""
-    # Email format validation
-    email_pattern = r"^[^@]+@[^@]+\.[^@]+$"
-    if not re.match(email_pattern, email):
+async def check_email(email: str) -> Dict[str, Any]:
+    """Check an email's format and whether it is already registered."""
+    # Email format validation (over-long input fails the guarded match)
+    try:
+        valid_format = EMAIL_PATTERN.match(email) is not None
+    except PatternTimeout:
+        valid_format = False
+    if not valid_format:
         return {
             "valid": False,
             "message": "Invalid email format"
         }
     
-    # Check if email already exists
-    if email.lower() in registered_emails:
+    # Check if email already exists, asking the store unless the index rules it out
+    normalized = normalize_email(email)
+    if email_index.might_contain(normalized) and await ASYNC_VALIDATION_CACHE.get(
+        ("unique_email", normalized),
+        lambda: run_in_threadpool(submission_store.has_unique, "email", normalized)
+    ):
         return {
             "valid": False,
             "message": "This email is already registered"
@@ -179,129 +345,423 @@ async def validate_email(email: str = Query(..., description="Email to validate"
     }
 
 
-@app.post("/api/validate", tags=["Validation"], response_model=FormValidationResponse)
-async def validate_form(submission: FormSubmission):
-    """Validate form data against schema rules."""
-    errors: List[ValidationError] = []
+@app.get("/api/validate/email", tags=["Validation"])
+async def validate_email(email: str = Query(..., description="Email to validate")):
+    """Validate if email is unique (async validation example)."""
+    return await check_email(email)
+
+
+# Hard cap on /api/validate and /api/submit bodies; each form's budget may be lower
+MAX_SUBMISSION_BYTES = int(os.environ.get("MAX_SUBMISSION_BYTES", str(DEFAULT_MAX_BODY_BYTES)))
+
+
+def submission_budget(form_id: Optional[str]) -> int:
+    """Byte budget for a form's submissions (the hard cap for unknown forms)."""
+    entry = schema_registry.get(form_id) if form_id else None
+    return entry.limits.max_bytes if entry is not None else MAX_SUBMISSION_BYTES
+
+
+async def read_submission(request: Request) -> FormSubmission:
+    """
+    Read and parse a submission body within its form's limits: 413 once
+    the body exceeds the byte budget, 422 for data keys the schema does not
+    define or values nested deeper than their param allows.
+    """
+    body = await read_limited_body(request, MAX_SUBMISSION_BYTES, submission_budget)
+    submission = parse_submission(body)
+    entry = schema_registry.get(submission.formId, submission.schemaVersion) if submission.formId else None
+    if entry is not None:
+        check_body_size(body, entry.limits.max_bytes)
+        entry.limits.check(submission.data)
+    return submission
+
+
+async def validate_submission(submission: FormSubmission) -> List[ValidationError]:
+    """Validate a submission against its schema version, recording latency and error codes."""
+    start = perf_counter()
+    # Large submissions are validated in a worker process when enabled
+    errors = await validation_pool.validate(
+        submission.formId, submission.data, submission.schemaVersion, metrics.check_observer()
+    )
+    if METRICS_ENABLED and submission.formId and schema_registry.get(submission.formId) is not None:
+        metrics.validations.observe(submission.formId, perf_counter() - start)
+        metrics.count_errors(errors)
+    return errors
+
+
+@app.post(
+    "/api/validate",
+    tags=["Validation"],
+    response_model=FormValidationResponse,
+    openapi_extra=SUBMISSION_REQUEST_BODY
+)
+async def validate_form(request: Request):
+    """
+    Validate form data against schema rules.
+    Takes a FormSubmission; the body is parsed and the response written
+    without building models on the hot path.
+    """
+    submission = await read_submission(request)
+    errors = await validate_submission(submission)
     
-    # Get schema if formId is provided
-    if submission.formId and submission.formId in SCHEMA_REGISTRY:
-        schema = SCHEMA_REGISTRY[submission.formId]
-        
-        # Collect all parameters
-        all_params = {}
-        for category in schema.paramCategories:
-            for param in category.params:
-                all_params[param.name] = param
-        
-        # Validate required fields
-        for param_name, param in all_params.items():
-            if param.required and param_name not in submission.data:
-                errors.append(ValidationError(
-                    field=param_name,
-                    message=f"{param.description} is required",
-                    code="required"
-                ))
-            
-            # Validate field content if present
-            if param_name in submission.data:
-                value = submission.data[param_name]
-                
-                # String validation
-                if hasattr(param.content, 'type') and param.content.type == "string":
-                    if hasattr(param.content, 'minLength') and param.content.minLength:
-                        if len(str(value)) < param.content.minLength:
-                            errors.append(ValidationError(
-                                field=param_name,
-                                message=f"{param.description} must be at least {param.content.minLength} characters",
-                                code="minLength"
-                            ))
-                    
-                    if hasattr(param.content, 'pattern') and param.content.pattern:
-                        if not re.match(param.content.pattern, str(value)):
-                            errors.append(ValidationError(
-                                field=param_name,
-                                message=f"{param.description} has invalid format",
-                                code="pattern"
-                            ))
-                
-                # Number validation
-                if hasattr(param.content, 'type') and param.content.type in ["number", "integer"]:
-                    try:
-                        num_value = float(value)
-                        if hasattr(param.content, 'min') and param.content.min is not None:
-                            if num_value < param.content.min:
-                                errors.append(ValidationError(
-                                    field=param_name,
-                                    message=f"{param.description} must be at least {param.content.min}",
-                                    code="min"
-                                ))
-                        
-                        if hasattr(param.content, 'max') and param.content.max is not None:
-                            if num_value > param.content.max:
-                                errors.append(ValidationError(
-                                    field=param_name,
-                                    message=f"{param.description} must be at most {param.content.max}",
-                                    code="max"
-                                ))
-                    except (ValueError, TypeError):
-                        errors.append(ValidationError(
-                            field=param_name,
-                            message=f"{param.description} must be a number",
-                            code="type"
-                        ))
+    return Response(validation_response_json(errors), media_type="application/json")
+
+
+@app.post("/api/validate/incremental", tags=["Validation"], response_model=IncrementalValidationResponse)
+async def validate_incremental(request: IncrementalValidationRequest):
+    """
+    Re-validate only the changed fields and their transitive dependents.
+    Fields cleared by cascadeReset are removed and left unvalidated.
+    """
+    entry = schema_registry.get(request.formId, request.schemaVersion)
+    if entry is None:
+        raise HTTPException(status_code=404, detail=f"Schema '{request.formId}' not found")
+    graph = entry.graph
+    
+    data = dict(request.data)
+    for name, value in request.changes.items():
+        if value is None:
+            data.pop(name, None)
+        else:
+            data[name] = value
+    
+    reset = graph.reset(request.changes)
+    for name in reset:
+        data.pop(name, None)
+    
+    # Fields just cleared by the cascade are for the user to fill in again,
+    # so they are not validated (and not reported as missing) yet
+    cleared = set(reset)
+    validated = [name for name in graph.affected(request.changes) if name not in cleared]
+    errors = entry.plan.validate_fields(data, validated)
     
-    return FormValidationResponse(
-        valid=len(errors) == 0,
-        errors=errors
+    return IncrementalValidationResponse(
+        valid=not errors,
+        errors=errors,
+        validated=validated,
+        reset=reset
     )
 
 
-# ============================================================================
-# Form Submission Endpoints
-# ============================================================================
+# Maximum number of submissions accepted by the batch endpoint
+MAX_BATCH_SIZE = 10000
 
-@app.post("/api/submit", tags=["Forms"], response_model=FormSubmissionResponse)
-async def submit_form(submission: FormSubmission):
-    """Submit form data."""
-    # Validate first
-    validation_result = await validate_form(submission)
+# Hard cap on /api/validate/batch bodies, enforced while reading
+MAX_BATCH_BYTES = int(os.environ.get("MAX_BATCH_BYTES", str(32 * 1024 * 1024)))
+
+_submission_list = TypeAdapter(List[FormSubmission])
+
+
+def batch_too_large(count: int) -> HTTPException:
+    """413 for a batch with more than MAX_BATCH_SIZE submissions."""
+    return HTTPException(
+        status_code=413,
+        detail=f"Batch too large: {count} submissions (maximum {MAX_BATCH_SIZE})"
+    )
+
+
+def parse_submission_batch(body: bytes, content_type: str) -> List[FormSubmission]:
+    """
+    Parse a JSON array or NDJSON body into submissions. NDJSON parsing
+    stops with 413 at the first record past MAX_BATCH_SIZE.
+    """
+    if "ndjson" in content_type or "jsonl" in content_type:
+        submissions = []
+        for line_number, line in enumerate(body.splitlines(), start=1):
+            if not line.strip():
+                continue
+            if len(submissions) >= MAX_BATCH_SIZE:
+                raise batch_too_large(len(submissions) + 1)
+            try:
+                submissions.append(FormSubmission.model_validate_json(line))
+            except PydanticValidationError as e:
+                raise RequestValidationError([
+                    {**error, "loc": ("body", line_number) + tuple(error["loc"])}
+                    for error in e.errors(include_url=False)
+                ])
+        return submissions
     
-    if not validation_result.valid:
-        return FormSubmissionResponse(
-            success=False,
-            message="Form validation failed",
-            data={"errors": [error.dict() for error in validation_result.errors]}
-        )
+    try:
+        return _submission_list.validate_json(body)
+    except PydanticValidationError as e:
+        raise RequestValidationError([
+            {**error, "loc": ("body",) + tuple(error["loc"])}
+            for error in e.errors(include_url=False)
+        ])
+
+
+@app.post(
+    "/api/validate/batch",
+    tags=["Validation"],
+    response_model=BatchValidationResponse,
+    openapi_extra={
+        "requestBody": {
+            "required": True,
+            "content": {
+                "application/json": {
+                    "schema": {"type": "array", "items": SUBMISSION_SCHEMA}
+                },
+                "application/x-ndjson": {
+                    "schema": {"type": "string", "description": "One FormSubmission JSON object per line"}
+                },
+            },
+        }
+    },
+)
+async def validate_batch(request: Request):
+    """
+    Validate many submissions (JSON array or NDJSON) in one request.
+    Bodies over MAX_BATCH_BYTES are rejected with 413 while reading.
+    """
+    body = await read_limited_body(request, MAX_BATCH_BYTES, lambda form_id: MAX_BATCH_BYTES)
+    submissions = parse_submission_batch(body, request.headers.get("content-type", ""))
     
-    # Process submission
-    submission_record = {
-        "formId": submission.formId,
-        "data": submission.data,
-        "timestamp": None  # Would use datetime in production
-    }
+    if len(submissions) > MAX_BATCH_SIZE:
+        raise batch_too_large(len(submissions))
+    
+    results = [
+        FormValidationResponse(valid=not errors, errors=errors)
+        for errors in await validation_pool.validate_many(submissions)
+    ]
+    valid_count = sum(1 for result in results if result.valid)
+    if METRICS_ENABLED:
+        for result in results:
+            metrics.count_errors(result.errors)
     
-    submitted_forms.append(submission_record)
+    return BatchValidationResponse(
+        results=results,
+        validCount=valid_count,
+        invalidCount=len(results) - valid_count
+    )
+
+
+# ============================================================================
+# Form Submission Endpoints
+# ============================================================================
+
+async def claim_email(email: str) -> bool:
+    """Reserve a normalized registration email; False if it is already taken."""
+    claimed = await run_in_threadpool(submission_store.claim_unique, "email", email)
+    email_index.add(email)
+    ASYNC_VALIDATION_CACHE.invalidate(("unique_email", email))
+    return claimed
+
+
+async def record_submission(submission: FormSubmission) -> FormSubmissionResponse:
+    """
+    Persist a validated submission, enforcing unique registration emails.
+    The submission should already be pinned to its schema version.
+    """
+    email = None
     
     # Special handling for user registration
-    if submission.formId == "user_registration" and "email" in submission.data:
-        registered_emails.add(submission.data["email"].lower())
+    if submission.formId == "user_registration" and isinstance(submission.data.get("email"), str):
+        email = normalize_email(submission.data["email"])
+        if not await claim_email(email):
+            metrics.count_errors([EMAIL_TAKEN_ERROR])
+            return validation_failed_response([EMAIL_TAKEN_ERROR])
+    
+    try:
+        submission_id = await asyncio.wrap_future(
+            submission_store.add(submission.formId, submission.data, submission.schemaVersion)
+        )
+    except Exception:
+        if email is not None:
+            await run_in_threadpool(submission_store.release_unique, "email", email)
+        raise
     
     return FormSubmissionResponse(
         success=True,
         message="Form submitted successfully",
-        data={"submissionId": len(submitted_forms)}
+        data={"submissionId": submission_id}
+    )
+
+
+def validation_failed_response(errors: List[ValidationError]) -> FormSubmissionResponse:
+    """Build the submission response for a form that failed validation."""
+    return FormSubmissionResponse(
+        success=False,
+        message=VALIDATION_FAILED_MESSAGE,
+        data={"errors": [error.dict() for error in errors]}
+    )
+
+
+@app.post(
+    "/api/submit",
+    tags=["Forms"],
+    response_model=FormSubmissionResponse,
+    openapi_extra=SUBMISSION_REQUEST_BODY
+)
+async def submit_form(request: Request):
+    """Submit form data (a FormSubmission, parsed like /api/validate)."""
+    submission = pin_schema_version(await read_submission(request))
+    
+    # Validate first
+    errors = await validate_submission(submission)
+    
+    if errors:
+        return Response(submission_failed_json(errors), media_type="application/json")
+    
+    # Process submission
+    result = await record_submission(submission)
+    return Response(result.model_dump_json(), media_type="application/json")
+
+
+# Maximum number of streamed submissions awaiting storage at once
+MAX_IN_FLIGHT_SUBMISSIONS = 256
+
+
+def ndjson_result_line(line_number: int, result: FormSubmissionResponse) -> bytes:
+    """Encode one streamed submission result as an NDJSON line."""
+    return b'{"line":%d,"result":%s}\n' % (line_number, result.model_dump_json().encode("utf-8"))
+
+
+async def submit_ndjson_records(request: Request):
+    """
+    Validate and persist NDJSON records as they arrive, yielding one result
+    line each in input order. Up to MAX_IN_FLIGHT_SUBMISSIONS valid records
+    are stored concurrently so they share storage commits.
+    """
+    pending = deque()
+    
+    async for line_number, record in iter_ndjson_records(request.stream()):
+        if record is None:
+            result = FormSubmissionResponse(
+                success=False,
+                message=f"Record exceeds the maximum size of {MAX_RECORD_BYTES} bytes"
+            )
+        else:
+            try:
+                submission = FormSubmission.model_validate_json(record)
+            except PydanticValidationError as e:
+                result = FormSubmissionResponse(
+                    success=False,
+                    message="Invalid submission",
+                    data={"errors": [
+                        {"loc": list(error["loc"]), "msg": error["msg"]}
+                        for error in e.errors(include_url=False)
+                    ]}
+                )
+            else:
+                try:
+                    submission = pin_schema_version(submission)
+                    errors = await validate_submission(submission)
+                except (SchemaLoadError, SchemaVersionUnavailable) as e:
+                    result = FormSubmissionResponse(success=False, message=str(e))
+                else:
+                    if errors:
+                        result = validation_failed_response(errors)
+                    else:
+                        result = asyncio.ensure_future(record_submission(submission))
+        
+        pending.append((line_number, result))
+        
+        # Emit settled results in order; block on the oldest once the window is full
+        while pending and (len(pending) >= MAX_IN_FLIGHT_SUBMISSIONS or is_settled(pending[0][1])):
+            yield await stored_result_line(*pending.popleft())
+    
+    while pending:
+        yield await stored_result_line(*pending.popleft())
+
+
+def is_settled(result) -> bool:
+    """Whether a streamed result is final (not a pending store)."""
+    return not isinstance(result, asyncio.Future) or result.done()
+
+
+async def stored_result_line(line_number: int, result) -> bytes:
+    """Wait for a pending store (if any) and encode its result line."""
+    if isinstance(result, asyncio.Future):
+        result = await result
+    return ndjson_result_line(line_number, result)
+
+
+@app.post(
+    "/api/submit/stream",
+    tags=["Forms"],
+    openapi_extra={
+        "requestBody": {
+            "required": True,
+            "content": {
+                "application/x-ndjson": {
+                    "schema": {"type": "string", "description": "One FormSubmission JSON object per line"}
+                }
+            },
+        }
+    },
+)
+async def submit_stream(request: Request):
+    """
+    Submit many forms as a chunked NDJSON stream.
+    Each record is validated and stored as it arrives; results stream back
+    as NDJSON lines of the form {"line": n, "result": FormSubmissionResponse}.
+    """
+    return DuplexStreamingResponse(
+        submit_ndjson_records(request),
+        media_type="application/x-ndjson"
     )
 
 
-@app.get("/api/submissions", tags=["Forms"])
+@app.get("/api/submissions", tags=["Forms"], response_model=SubmissionPage)
 async def get_submissions(
-    form_id: Optional[str] = Query(None, description="Filter by form ID")
+    form_id: Optional[str] = Query(None, description="Filter by form ID"),
+    limit: int = Query(100, ge=1, le=1000, description="Page size"),
+    after: int = Query(0, ge=0, description="Return submissions after this submissionId (cursor)"),
+    filter: List[str] = Query([], description="Data filter as key=value (repeatable)"),
+    count_only: bool = Query(False, description="Only return the number of matching submissions")
+):
+    """Get form submissions, one page at a time (admin endpoint)."""
+    try:
+        filters = [parse_filter(expression) for expression in filter]
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    if count_only:
+        count = await run_in_threadpool(submission_store.count, form_id or None, filters)
+        return SubmissionPage(count=count)
+    
+    # Fetch one extra row to know whether another page exists
+    items = await run_in_threadpool(
+        submission_store.query, form_id or None, after, limit + 1, filters
+    )
+    next_cursor = None
+    if len(items) > limit:
+        items = items[:limit]
+        next_cursor = items[-1]["submissionId"]
+    
+    return SubmissionPage(items=items, nextCursor=next_cursor)
+
+
+@app.get("/api/submissions/export", tags=["Forms"])
+async def export_submissions(
+    form_id: str = Query(..., description="Form ID to export"),
+    format: Literal["ndjson", "csv", "columnar"] = Query("ndjson", description="Export format"),
+    chunk_size: int = Query(1000, ge=1, le=100000, description="Rows per streamed chunk")
 ):
-    """Get all form submissions (admin endpoint)."""
-    if form_id:
-        return [s for s in submitted_forms if s.get("formId") == form_id]
-    return submitted_forms
+    """
+    Stream all submissions for a form (admin endpoint).
+    CSV and columnar columns follow the schema's params in paramCategories order.
+    """
+    entry = schema_registry.get(form_id)
+    if entry is None:
+        raise HTTPException(status_code=404, detail=f"Schema '{form_id}' not found")
+    
+    records = submission_store.iter(form_id, batch_size=chunk_size)
+    columns = schema_columns(entry.schema)
+    
+    if format == "csv":
+        body = iter_csv(records, columns, chunk_size)
+    elif format == "columnar":
+        body = iter_columnar(records, columns, chunk_size)
+    else:
+        body = iter_ndjson(records)
+    
+    extension = "csv" if format == "csv" else "ndjson"
+    return StreamingResponse(
+        body,
+        media_type=EXPORT_MEDIA_TYPES[format],
+        headers={"Content-Disposition": f'attachment; filename="{form_id}.{extension}"'}
+    )
 
 
 # ============================================================================
@@ -313,11 +773,22 @@ async def health_check():
     """Health check endpoint."""
     return {
         "status": "healthy",
-        "schemas_loaded": len(SCHEMA_REGISTRY),
-        "submissions_count": len(submitted_forms)
+        "schemas_loaded": len(schema_registry.loaded()),
+        "submissions_count": await run_in_threadpool(submission_store.count),
+        "pattern_cache": PATTERN_CACHE.stats(),
+        "email_index": email_index.stats(),
+        "async_validation_cache": ASYNC_VALIDATION_CACHE.stats(),
+        "validation_pool": validation_pool.stats(),
+        "schema_registry": schema_registry.stats()
     }
 
 
+@app.get("/api/metrics", tags=["Health"], response_class=PlainTextResponse)
+async def get_metrics():
+    """Latency histograms and validation error counters in Prometheus text format."""
+    return Response(metrics.render(), media_type=PROMETHEUS_CONTENT_TYPE)
+
+
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run("main:app", host="0.0.0.0", port=8000, reload=True)
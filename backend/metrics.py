@@ -0,0 +1,225 @@
+"""
+Lightweight latency metrics in Prometheus text format.
+Histograms have fixed buckets and are allocated once per label value, so
+recording a timing is a bisect and two increments. Requests, per-form
+validation and storage operations are timed every time; per-check
+profiling, which adds a timer call per check, runs on a sample of requests.
+Updates are not locked: an increment racing another thread may
+occasionally be lost, which is acceptable for monitoring.
+"""
+
+from abc import ABC, abstractmethod
+from bisect import bisect_left
+from time import perf_counter
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+from models import ValidationError
+
+
+# Upper bounds of the latency buckets, in seconds
+LATENCY_BUCKETS: Tuple[float, ...] = (
+    0.00001, 0.000025, 0.00005, 0.0001, 0.00025, 0.0005,
+    0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0
+)
+
+# Distinct label values kept per metric; further values are counted under OVERFLOW_LABEL
+MAX_LABEL_VALUES = 256
+OVERFLOW_LABEL = "other"
+
+# Share of validations profiled check by check
+DEFAULT_SAMPLE_RATE = 0.01
+
+PROMETHEUS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _number(value: float) -> str:
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Histogram:
+    """Fixed-bucket histogram; counts[i] is the number of observations in bucket i."""
+    __slots__ = ("bounds", "counts", "sum")
+
+    def __init__(self, bounds: Tuple[float, ...]):
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)
+        self.sum = 0.0
+
+    def observe(self, seconds: float) -> None:
+        self.counts[bisect_left(self.bounds, seconds)] += 1
+        self.sum += seconds
+
+
+class _Family(ABC):
+    """A metric with one label, holding a series per label value."""
+    kind = ""
+
+    def __init__(self, name: str, help: str, label: str):
+        self.name = name
+        self.help = help
+        self.label = label
+        self.series: Dict[str, object] = {}
+
+    @abstractmethod
+    def _new(self) -> object:
+        """Allocate the series for a new label value."""
+
+    def labels(self, value: str):
+        """Series for a label value, allocated on first use."""
+        series = self.series.get(value)
+        if series is None:
+            if len(self.series) >= MAX_LABEL_VALUES:
+                value = OVERFLOW_LABEL
+            series = self.series.get(value)
+            if series is None:
+                series = self.series[value] = self._new()
+        return series
+
+    def render(self) -> Iterable[str]:
+        yield f"# HELP {self.name} {self.help}"
+        yield f"# TYPE {self.name} {self.kind}"
+        for value, series in list(self.series.items()):
+            yield from self._render_series(f'{self.label}="{_escape(value)}"', series)
+
+    @abstractmethod
+    def _render_series(self, labels: str, series) -> Iterable[str]:
+        """Exposition lines for one series, given its rendered label pair."""
+
+
+class HistogramFamily(_Family):
+    """Latency histograms by label value."""
+    kind = "histogram"
+
+    def __init__(self, name: str, help: str, label: str, buckets: Tuple[float, ...] = LATENCY_BUCKETS):
+        super().__init__(name, help, label)
+        self.buckets = buckets
+
+    def _new(self) -> Histogram:
+        return Histogram(self.buckets)
+
+    def observe(self, value: str, seconds: float) -> None:
+        self.labels(value).observe(seconds)
+
+    def _render_series(self, labels: str, series: Histogram) -> Iterable[str]:
+        counts = list(series.counts)
+        cumulative = 0
+        for bound, count in zip(self.buckets, counts):
+            cumulative += count
+            yield f'{self.name}_bucket{{{labels},le="{_number(bound)}"}} {cumulative}'
+        cumulative += counts[-1]
+        yield f'{self.name}_bucket{{{labels},le="+Inf"}} {cumulative}'
+        yield f"{self.name}_sum{{{labels}}} {_number(series.sum)}"
+        yield f"{self.name}_count{{{labels}}} {cumulative}"
+
+
+class CounterFamily(_Family):
+    """Counters by label value."""
+    kind = "counter"
+
+    def _new(self) -> List[int]:
+        return [0]
+
+    def inc(self, value: str, amount: int = 1) -> None:
+        self.labels(value)[0] += amount
+
+    def _render_series(self, labels: str, series: List[int]) -> Iterable[str]:
+        yield f"{self.name}{{{labels}}} {series[0]}"
+
+
+# ============================================================================
+# Application Metrics
+# ============================================================================
+
+class Metrics:
+    """
+    The application's metrics. `sample_rate` is the share of validations
+    profiled check by check (0 disables profiling); sampling is by stride,
+    so no random numbers are drawn on the hot path.
+    """
+
+    def __init__(self, sample_rate: float = DEFAULT_SAMPLE_RATE):
+        self.sample_rate = sample_rate
+        self._stride = round(1 / sample_rate) if sample_rate > 0 else 0
+        self._tick = 0
+        self.requests = HistogramFamily(
+            "http_request_duration_seconds", "Request latency by route.", "route"
+        )
+        self.validations = HistogramFamily(
+            "form_validation_duration_seconds", "Single-submission validation latency by form.", "form_id"
+        )
+        self.checks = HistogramFamily(
+            "form_check_duration_seconds", "Validation check latency by check kind (sampled).", "check"
+        )
+        self.errors = CounterFamily(
+            "form_validation_errors_total", "Validation errors by error code.", "code"
+        )
+        self.storage = HistogramFamily(
+            "storage_operation_duration_seconds", "Submission store latency by operation.", "operation"
+        )
+
+    def sample(self) -> bool:
+        """True for one validation in every 1/sample_rate."""
+        if not self._stride:
+            return False
+        self._tick += 1
+        if self._tick < self._stride:
+            return False
+        self._tick = 0
+        return True
+
+    def check_observer(self) -> Optional[Callable[[str, float], None]]:
+        """Per-check observer if this validation is sampled, else None."""
+        return self.checks.observe if self.sample() else None
+
+    def count_errors(self, errors: List[ValidationError]) -> None:
+        for error in errors:
+            self.errors.inc(error.code)
+
+    def render(self) -> str:
+        """All metrics in Prometheus text exposition format."""
+        lines: List[str] = []
+        for family in (self.requests, self.validations, self.checks, self.errors, self.storage):
+            lines.extend(family.render())
+        return "\n".join(lines) + "\n"
+
+
+class MetricsMiddleware:
+    """
+    ASGI middleware timing each HTTP request, labelled by the matched route
+    template ("GET /api/schemas/{schema_id}") so path parameters do not
+    create new series. Requests that match no route are labelled "unmatched".
+    """
+
+    def __init__(self, app, metrics: Metrics):
+        self.app = app
+        self.metrics = metrics
+        self._routes: Dict[Tuple[object, str], str] = {}
+
+    async def __call__(self, scope, receive, send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        start = perf_counter()
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            self.metrics.requests.observe(self._route(scope), perf_counter() - start)
+
+    def _route(self, scope) -> str:
+        """Route label for a request, from the endpoint the router matched."""
+        endpoint = scope.get("endpoint")
+        if endpoint is None:
+            return "unmatched"
+        key = (endpoint, scope["method"])
+        label = self._routes.get(key)
+        if label is None:
+            route = next(
+                (route for route in scope["app"].routes if getattr(route, "endpoint", None) is endpoint), None
+            )
+            path = getattr(route, "path", None) or "unmatched"
+            label = self._routes[key] = f'{scope["method"]} {path}'
+        return label
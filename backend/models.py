@@ -226,6 +226,9 @@ class FormSchema(BaseModel):
 class FormSubmission(BaseModel):
     """Form submission data."""
     formId: Optional[str] = Field(None, description="Form identifier")
+    schemaVersion: Optional[str] = Field(
+        None, description="Schema version the form was rendered from; defaults to the current version"
+    )
     data: Dict[str, Any] = Field(..., description="Form field values")
 
 
@@ -242,6 +245,36 @@ class FormValidationResponse(BaseModel):
     errors: List[ValidationError] = Field(default_factory=list, description="List of validation errors")
 
 
+class BatchValidationResponse(BaseModel):
+    """Response for batch validation, one result per submission in input order."""
+    results: List[FormValidationResponse] = Field(..., description="Validation result per submission")
+    validCount: int = Field(..., description="Number of valid submissions")
+    invalidCount: int = Field(..., description="Number of invalid submissions")
+
+
+class IncrementalValidationRequest(BaseModel):
+    """Field changes to re-validate against the current form state."""
+    formId: str = Field(..., description="Form identifier")
+    schemaVersion: Optional[str] = Field(None, description="Schema version the form was rendered from")
+    data: Dict[str, Any] = Field(default_factory=dict, description="Form values before the change")
+    changes: Dict[str, Any] = Field(..., description="Changed field values; null clears a field")
+
+
+class IncrementalValidationResponse(BaseModel):
+    """Validation result for the fields affected by a change."""
+    valid: bool = Field(..., description="Whether every re-validated field is valid")
+    errors: List[ValidationError] = Field(default_factory=list, description="Errors in the re-validated fields")
+    validated: List[str] = Field(default_factory=list, description="Fields re-validated, in dependency order")
+    reset: List[str] = Field(default_factory=list, description="Dependent fields cleared by cascadeReset")
+
+
+class SubmissionPage(BaseModel):
+    """One page of stored submissions."""
+    items: List[Dict[str, Any]] = Field(default_factory=list, description="Submissions in this page, in ID order")
+    nextCursor: Optional[int] = Field(None, description="Pass as `after` to fetch the next page; null on the last page")
+    count: Optional[int] = Field(None, description="Total matching submissions (count-only mode)")
+
+
 class FormSubmissionResponse(BaseModel):
     """Response for form submission."""
     success: bool = Field(..., description="Whether submission was successful")
@@ -0,0 +1,370 @@
+"""
+Option sources for the dynamic data endpoints.
+Option lists are built once and served as pre-serialized, cacheable
+responses keyed by their parent value, with an in-memory search index
+for `?q=` queries over large lists.
+"""
+
+from collections import defaultdict
+import re
+import unicodedata
+from bisect import bisect_left
+from typing import Callable, Dict, FrozenSet, Iterable, List, Optional, Sequence, Tuple
+
+from fastapi import Response
+from pydantic import TypeAdapter
+
+from models import EnumValue, FormSchema
+from prepared import PreparedResponse
+
+
+# Cache lifetime when no schema declares a cacheDuration for a source
+DEFAULT_CACHE_DURATION = 300
+
+# Minimum query length when no schema declares a minSearchLength for a source
+DEFAULT_MIN_SEARCH_LENGTH = 1
+
+# X-Total-Count for a search is exact up to this many matches
+SEARCH_COUNT_LIMIT = 1000
+
+_WORD = re.compile(r"[^\W_]+")
+
+_enum_values = TypeAdapter(List[EnumValue])
+
+
+# ============================================================================
+# Search Index
+# ============================================================================
+
+def normalize(text: str) -> str:
+    """Case- and accent-insensitive form used for indexing and queries."""
+    if text.isascii():
+        return text.lower()
+    text = unicodedata.normalize("NFKD", text.casefold())
+    return "".join(c for c in text if not unicodedata.combining(c))
+
+
+def _trigrams(text: str) -> set:
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+
+class OptionIndex:
+    """
+    Prefix and trigram index over the labels and values of one option list.
+
+    Results are ranked by tier (exact, label prefix, word prefix, substring),
+    then list order. Each tier is produced in list order and the search stops
+    once a page is filled: a tier with few candidates (found by bisecting a
+    sorted term list, or by intersecting trigram posting sets for substring
+    queries of three or more characters) is sorted, while a tier with many is
+    scanned option by option from the start of the list, where matches are
+    dense. The total is counted up to SEARCH_COUNT_LIMIT.
+    """
+    __slots__ = (
+        "values", "_labels", "_terms", "_texts", "_exact_ids",
+        "_label_keys", "_label_ids", "_term_keys", "_term_ids", "_trigrams"
+    )
+
+    def __init__(self, values: Sequence[EnumValue]):
+        self.values = tuple(values)
+        self._labels: List[str] = []
+        self._exact_ids: Dict[str, List[int]] = defaultdict(list)
+        self._terms: List[Tuple[str, ...]] = []
+        self._texts: List[str] = []
+        label_entries: List[Tuple[str, int]] = []
+        term_entries: List[Tuple[str, int]] = []
+        trigrams: Dict[str, List[int]] = defaultdict(list)
+
+        for index, option in enumerate(self.values):
+            label = normalize(option.label)
+            value = normalize(option.value)
+            # Value and later words of the label, for word-prefix matches
+            terms = tuple(dict.fromkeys([value] + _WORD.findall(label)[1:]))
+            self._labels.append(label)
+            self._exact_ids[label].append(index)
+            if value != label:
+                self._exact_ids[value].append(index)
+            self._terms.append(terms)
+            text = f"{label}\x00{value}"
+            self._texts.append(text)
+
+            label_entries.append((label, index))
+            term_entries.extend((term, index) for term in terms)
+            # Trigrams spanning the separator never match a query
+            for trigram in _trigrams(text):
+                trigrams[trigram].append(index)
+
+        label_entries.sort()
+        term_entries.sort()
+        self._label_keys = [key for key, _ in label_entries]
+        self._label_ids = [index for _, index in label_entries]
+        self._term_keys = [key for key, _ in term_entries]
+        self._term_ids = [index for _, index in term_entries]
+        self._trigrams: Dict[str, FrozenSet[int]] = {t: frozenset(ids) for t, ids in trigrams.items()}
+
+    def search(self, query: str, offset: int = 0, limit: int = 50) -> Tuple[int, List[EnumValue]]:
+        """Return (total matches, capped at SEARCH_COUNT_LIMIT; ranked page of options) for a query."""
+        q = normalize(query).strip()
+        if not q:
+            return len(self.values), list(self.values[offset:offset + limit])
+
+        wanted = offset + limit
+        label_lo, label_hi = _prefix_range(self._label_keys, q)
+        term_lo, term_hi = _prefix_range(self._term_keys, q)
+        labels, terms = self._labels, self._terms
+
+        # Substring candidates, unless prefix matches alone reach the count limit
+        candidates: Optional[FrozenSet[int]] = None
+        if len(q) >= 3 and label_hi - label_lo < SEARCH_COUNT_LIMIT:
+            candidates = self._candidates(q)
+
+        # Tiers are built only when the page is not full yet
+        tiers: List[Callable[[], Iterable[int]]] = [
+            lambda: self._exact_ids.get(q, ()),
+            lambda: self._tier(
+                label_hi - label_lo, lambda: self._label_ids[label_lo:label_hi], wanted,
+                lambda index: labels[index].startswith(q)
+            ),
+            lambda: self._tier(
+                term_hi - term_lo, lambda: self._term_ids[term_lo:term_hi], wanted,
+                lambda index: any(term.startswith(q) for term in terms[index])
+            ),
+        ]
+        if len(q) >= 3:
+            tiers.append(lambda: self._substring_tier(q, candidates, wanted))
+
+        page: List[int] = []
+        seen = set()
+        for tier in tiers:
+            for index in tier():
+                if index not in seen:
+                    seen.add(index)
+                    page.append(index)
+                    if len(page) == wanted:
+                        break
+            if len(page) == wanted:
+                break
+
+        total = self._count(q, candidates, label_lo, label_hi, term_lo, term_hi)
+        return max(total, len(page)), [self.values[index] for index in page[offset:]]
+
+    def _candidates(self, q: str) -> FrozenSet[int]:
+        """Options containing every trigram of a query of three or more characters."""
+        postings = sorted((self._trigrams.get(t, frozenset()) for t in _trigrams(q)), key=len)
+        return postings[0].intersection(*postings[1:]) if len(postings) > 1 else postings[0]
+
+    def _substring_tier(self, q: str, candidates: Optional[FrozenSet[int]], wanted: int) -> Iterable[int]:
+        """Options containing the query, in list order."""
+        if candidates is None:
+            candidates = self._candidates(q)
+        texts = self._texts
+        return self._tier(
+            len(candidates), lambda: candidates, wanted,
+            lambda index: q in texts[index], verified=False
+        )
+
+    def _tier(
+        self,
+        size: int,
+        found: Callable[[], Iterable[int]],
+        wanted: int,
+        matches: Callable[[int], bool],
+        verified: bool = True
+    ) -> Iterable[int]:
+        """
+        Matching options among the `size` indices from `found()`, in list
+        order: sorted when there are few (filtered with `matches` unless all
+        are known to match), otherwise scanned lazily in list order with
+        `matches`, testing about wanted * len(values) / size options before
+        a page fills.
+        """
+        # Sorting costs about `size`, scanning about wanted * len(values) / size
+        if size * size <= wanted * len(self.values):
+            indices = set(found())
+            return sorted(indices if verified else filter(matches, indices))
+        return (index for index in range(len(self.values)) if matches(index))
+
+    def _count(
+        self, q: str, candidates: Optional[FrozenSet[int]],
+        label_lo: int, label_hi: int, term_lo: int, term_hi: int
+    ) -> int:
+        """
+        Number of matching options, counted up to SEARCH_COUNT_LIMIT;
+        `candidates` are the substring candidates for queries of three or
+        more characters.
+        """
+        if label_hi - label_lo >= SEARCH_COUNT_LIMIT:
+            return SEARCH_COUNT_LIMIT
+        matched = set(self._label_ids[label_lo:label_hi])
+        term_ids = self._term_ids
+        for i in range(term_lo, term_hi):
+            matched.add(term_ids[i])
+            if len(matched) == SEARCH_COUNT_LIMIT:
+                return SEARCH_COUNT_LIMIT
+        if candidates is None:
+            return len(matched)
+
+        # Prefix matches are substring matches too, so only add the rest; a
+        # three-character query is its own only trigram, so every candidate matches
+        rest = candidates - matched
+        if len(q) == 3:
+            return min(len(matched) + len(rest), SEARCH_COUNT_LIMIT)
+        total = len(matched)
+        texts = self._texts
+        for index in rest:
+            if q in texts[index]:
+                total += 1
+                if total == SEARCH_COUNT_LIMIT:
+                    break
+        return total
+
+
+def _prefix_range(keys: List[str], prefix: str) -> Tuple[int, int]:
+    """Slice of a sorted key list whose keys start with `prefix`."""
+    lo = bisect_left(keys, prefix)
+    return lo, bisect_left(keys, prefix + "\U0010ffff", lo)
+
+
+# ============================================================================
+# Option Source
+# ============================================================================
+
+class OptionSource:
+    """
+    Static option lists keyed by parent value, with prepared responses.
+    configure() takes the cache settings from the schemas that reference
+    the source, and can be called again when schemas change.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        options: Dict[Optional[str], List[EnumValue]],
+        cache_duration: int = DEFAULT_CACHE_DURATION,
+        min_search_length: int = DEFAULT_MIN_SEARCH_LENGTH
+    ):
+        self.path = path
+        self.min_search_length = min_search_length
+        self.options = {key: tuple(values) for key, values in options.items()}
+        self._indexes = {key: OptionIndex(values) for key, values in self.options.items()}
+        self._prepare(cache_duration)
+
+    def _prepare(self, cache_duration: int) -> None:
+        """Serialize every option list with a Cache-Control lifetime."""
+        self.cache_duration = cache_duration
+        cache_control = f"public, max-age={cache_duration}"
+        self._empty = PreparedResponse(b"[]", cache_control)
+        self._responses = {
+            key: PreparedResponse(_enum_values.dump_json(list(values)), cache_control)
+            for key, values in self.options.items()
+        }
+
+    def configure(self, schemas: Iterable[FormSchema]) -> None:
+        """Apply cacheDuration and minSearchLength from schemas whose enums point at this source."""
+        schemas = list(schemas)
+        self.min_search_length = min_search_length_for(self.path, schemas)
+        cache_duration = cache_duration_for(self.path, schemas)
+        if cache_duration != self.cache_duration:
+            self._prepare(cache_duration)
+
+    def response(self, key: Optional[str] = None) -> PreparedResponse:
+        """Prepared response for a parent value; unknown keys get an empty list."""
+        return self._responses.get(key, self._empty)
+
+    def search(self, key: Optional[str], query: str, offset: int = 0, limit: int = 50) -> Response:
+        """
+        Ranked, paginated search within a parent value's options. Queries
+        shorter than min_search_length return an empty list. The total match
+        count is sent in the X-Total-Count header.
+        """
+        index = self._indexes.get(key)
+        if index is None or len(query.strip()) < self.min_search_length:
+            total, page = 0, []
+        else:
+            total, page = index.search(query, offset, limit)
+        return Response(
+            content=_enum_values.dump_json(page),
+            media_type="application/json",
+            headers={"X-Total-Count": str(total)}
+        )
+
+
+def cache_duration_for(path: str, schemas: Iterable[FormSchema]) -> int:
+    """
+    Cache lifetime for a source endpoint: the shortest cacheDuration declared
+    by any enum whose `source` points at it, or DEFAULT_CACHE_DURATION.
+    """
+    durations = [
+        param.content.cacheDuration
+        for schema in schemas
+        for category in schema.paramCategories
+        for param in category.params
+        if getattr(param.content, "source", None)
+        and param.content.source.split("?", 1)[0] == path
+        and getattr(param.content, "cacheDuration", None) is not None
+    ]
+    return min(durations) if durations else DEFAULT_CACHE_DURATION
+
+
+def min_search_length_for(path: str, schemas: Iterable[FormSchema]) -> int:
+    """
+    Minimum query length for a source endpoint: the largest minSearchLength
+    declared by any dependent enum whose `source` points at it.
+    """
+    lengths = [
+        param.content.minSearchLength
+        for schema in schemas
+        for category in schema.paramCategories
+        for param in category.params
+        if getattr(param.content, "source", None)
+        and param.content.source.split("?", 1)[0] == path
+        and getattr(param.content, "minSearchLength", None) is not None
+    ]
+    return max(lengths) if lengths else DEFAULT_MIN_SEARCH_LENGTH
+
+
+# ============================================================================
+# Example Option Data
+# ============================================================================
+
+COUNTRIES = [
+    EnumValue(label="United Kingdom", value="GB"),
+    EnumValue(label="United States", value="US"),
+    EnumValue(label="Canada", value="CA"),
+    EnumValue(label="Australia", value="AU"),
+    EnumValue(label="Germany", value="DE"),
+    EnumValue(label="France", value="FR"),
+]
+
+CITIES_BY_COUNTRY = {
+    "GB": [
+        EnumValue(label="London", value="london"),
+        EnumValue(label="Manchester", value="manchester"),
+        EnumValue(label="Birmingham", value="birmingham"),
+        EnumValue(label="Edinburgh", value="edinburgh"),
+    ],
+    "US": [
+        EnumValue(label="New York", value="new_york"),
+        EnumValue(label="Los Angeles", value="los_angeles"),
+        EnumValue(label="Chicago", value="chicago"),
+        EnumValue(label="Houston", value="houston"),
+    ],
+    "CA": [
+        EnumValue(label="Toronto", value="toronto"),
+        EnumValue(label="Vancouver", value="vancouver"),
+        EnumValue(label="Montreal", value="montreal"),
+    ],
+}
+
+SUBCATEGORIES_BY_PARENT = {
+    "electronics": [
+        EnumValue(label="Laptops", value="laptops"),
+        EnumValue(label="Phones", value="phones"),
+        EnumValue(label="Tablets", value="tablets"),
+    ],
+    "clothing": [
+        EnumValue(label="Men", value="men"),
+        EnumValue(label="Women", value="women"),
+        EnumValue(label="Children", value="children"),
+    ],
+}
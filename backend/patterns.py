@@ -0,0 +1,409 @@
+"""
+Compiled regex pattern store.
+Compiles schema patterns once at registration and serves them from a
+bounded, schema-aware cache with hit/miss accounting.
+
+Schema patterns run against untrusted input, so every pattern is checked
+for catastrophic-backtracking constructs when it is compiled, and matches
+are guarded: inputs are length-capped, run on a linear-time engine (re2)
+when installed, or with a per-match timeout when the `regex` module is
+(a requirement; matching falls back to `re`, with no timeout, only when it
+is missing). The static check is a heuristic, so the timeout or re2 is what
+bounds matching time.
+"""
+
+import logging
+import re
+from collections import Counter, OrderedDict
+from typing import Any, Callable, Dict, FrozenSet, Iterator, List, Optional, Set, Tuple
+
+try:
+    from re import _parser as sre_parse
+except ImportError:  # Python < 3.11
+    import sre_parse
+
+try:
+    import re2  # Linear-time engine, optional
+except ImportError:
+    re2 = None
+
+try:
+    import regex  # Backtracking engine with match timeouts, optional
+except ImportError:
+    regex = None
+
+from models import FormSchema
+
+logger = logging.getLogger(__name__)
+
+if re2 is None and regex is None:
+    logger.warning(
+        "Neither google-re2 nor regex is installed: schema patterns run on re "
+        "without a match timeout (install the packages in requirements.txt)"
+    )
+
+
+# Longest input a guarded pattern is matched against
+MAX_MATCH_INPUT = 4096
+
+# Per-match time budget in seconds (enforced by the `regex` engine)
+MATCH_TIMEOUT = 0.05
+
+# Repeats with an upper bound above this count as unbounded for analysis
+_UNBOUNDED_REPEAT = 64
+
+_REPEATS = (sre_parse.MAX_REPEAT, sre_parse.MIN_REPEAT)
+
+
+# ============================================================================
+# Guarded Patterns
+# ============================================================================
+
+class PatternTimeout(Exception):
+    """A guarded match exceeded its input length or time budget."""
+
+
+class GuardedPattern:
+    """
+    Compiled pattern with a bounded match() that raises PatternTimeout
+    instead of running unbounded on hostile input.
+    """
+    __slots__ = ("pattern", "engine", "max_input", "_match")
+
+    def __init__(self, pattern: str, engine: str, match: Callable[[str], Any], max_input: int = MAX_MATCH_INPUT):
+        self.pattern = pattern
+        self.engine = engine
+        self.max_input = max_input
+        self._match = match
+
+    def match(self, text: str) -> Any:
+        """Match at the start of `text`; raises PatternTimeout past the budget."""
+        if len(text) > self.max_input:
+            raise PatternTimeout(f"Input longer than {self.max_input} characters for pattern {self.pattern!r}")
+        try:
+            return self._match(text)
+        except TimeoutError:
+            raise PatternTimeout(f"Match timed out for pattern {self.pattern!r}") from None
+
+
+# ============================================================================
+# Pattern Cache
+# ============================================================================
+
+class PatternCache:
+    """
+    Bounded LRU store of compiled regex patterns.
+
+    Patterns referenced by a registered schema are pinned and never evicted
+    while that schema is registered; other entries are evicted least recently
+    used first once the cache holds more than `maxsize` unpinned patterns.
+    """
+
+    def __init__(self, maxsize: int = 1024):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._patterns: "OrderedDict[str, GuardedPattern]" = OrderedDict()
+        self._owners: Dict[str, Set[str]] = {}
+        self._schema_patterns: Dict[str, Set[str]] = {}
+
+    def get(self, pattern: str) -> GuardedPattern:
+        """Return the compiled pattern, compiling it on a miss."""
+        compiled = self._patterns.get(pattern)
+        if compiled is not None:
+            self.hits += 1
+            self._patterns.move_to_end(pattern)
+            return compiled
+
+        self.misses += 1
+        compiled = compile_pattern(pattern)
+        self._patterns[pattern] = compiled
+        self._evict()
+        return compiled
+
+    def register_schema(self, schema_id: str, schema: FormSchema) -> None:
+        """
+        Compile and pin every pattern used by a schema.
+
+        Raises ValueError naming the offending parameter if any pattern does
+        not compile, leaving the previously registered patterns untouched.
+        """
+        compiled: Dict[str, GuardedPattern] = {}
+        for param_name, pattern in iter_schema_patterns(schema):
+            if pattern in compiled:
+                continue
+            try:
+                compiled[pattern] = self._patterns.get(pattern) or compile_pattern(pattern)
+            except ValueError as e:
+                raise ValueError(f"Schema '{schema_id}', parameter '{param_name}': {e}") from None
+
+        self.unregister_schema(schema_id)
+        for pattern, regex in compiled.items():
+            self._patterns[pattern] = regex
+            self._owners.setdefault(pattern, set()).add(schema_id)
+        self._schema_patterns[schema_id] = set(compiled)
+        self._evict()
+
+    def unregister_schema(self, schema_id: str) -> None:
+        """Unpin the patterns of a schema so they become evictable."""
+        for pattern in self._schema_patterns.pop(schema_id, ()):
+            owners = self._owners.get(pattern)
+            if owners is not None:
+                owners.discard(schema_id)
+                if not owners:
+                    del self._owners[pattern]
+        self._evict()
+
+    def stats(self) -> Dict[str, int]:
+        """Return cache size and hit/miss counters."""
+        return {
+            "size": len(self._patterns),
+            "pinned": len(self._owners),
+            "maxsize": self.maxsize,
+            "hits": self.hits,
+            "misses": self.misses,
+            "engines": dict(Counter(p.engine for p in self._patterns.values())),
+        }
+
+    def _evict(self) -> None:
+        """Drop least recently used unpinned patterns beyond the bound."""
+        excess = len(self._patterns) - len(self._owners) - self.maxsize
+        if excess <= 0:
+            return
+        for pattern in list(self._patterns):
+            if pattern not in self._owners:
+                del self._patterns[pattern]
+                excess -= 1
+                if excess == 0:
+                    break
+
+
+# ============================================================================
+# Helpers
+# ============================================================================
+
+def compile_pattern(pattern: str) -> GuardedPattern:
+    """
+    Compile a regex pattern into a guarded pattern.
+
+    Raises ValueError if the pattern is invalid, or if it is prone to
+    catastrophic backtracking and no linear-time engine can run it.
+    """
+    try:
+        compiled = re.compile(pattern)
+    except re.error as e:
+        raise ValueError(f"Invalid regex pattern {pattern!r}: {e}") from None
+
+    if re2 is not None:
+        try:
+            return GuardedPattern(pattern, "re2", re2.compile(pattern).match)
+        except Exception:
+            pass  # Lookarounds and backreferences are not supported by re2
+
+    problem = find_backtracking_risk(pattern)
+    if problem:
+        raise ValueError(f"Unsafe regex pattern {pattern!r}: {problem}")
+
+    if regex is not None:
+        match = regex.compile(pattern).match
+        return GuardedPattern(pattern, "regex", lambda text: match(text, timeout=MATCH_TIMEOUT))
+    return GuardedPattern(pattern, "re", compiled.match)
+
+
+def find_backtracking_risk(pattern: str) -> Optional[str]:
+    """
+    Statically look for constructs that backtrack exponentially or with a
+    high polynomial degree: a variable-length repeat nested in another
+    repeat where one of the two is unbounded, an unbounded repeat over
+    alternatives that can start with the same character, or a chain of
+    three or more adjacent unbounded repeats over overlapping characters.
+    Returns a description, or None.
+
+    The check is best-effort: it rejects the common shapes of catastrophic
+    patterns, not every pattern that can backtrack heavily.
+    """
+    return _scan(sre_parse.parse(pattern), None)
+
+
+# Chains of this many adjacent unbounded repeats over overlapping characters
+# are rejected. n such repeats backtrack in O(len^n): a pair stays within a
+# fraction of a second at MAX_MATCH_INPUT, three do not. A mandatory repeat
+# over other characters ends the chain, so "^\s*\w+\s*$", "^[a-z]+\d+[a-z]+$"
+# and "^[A-Za-z0-9 ]+\s*$" are accepted while "^\d*\d+\d*$" and ".*.*.*="
+# are rejected
+_MAX_OVERLAPPING_REPEATS = 3
+
+# Enclosing-repeat contexts for _scan
+_BOUNDED, _UNBOUNDED = "bounded", "unbounded"
+
+
+def _scan(items, context: Optional[str]) -> Optional[str]:
+    """
+    Scan a sequence for risky constructs. `context` is _UNBOUNDED or
+    _BOUNDED inside a repeat that may run more than once without a
+    delimiter between iterations, None otherwise.
+    """
+    # (characters, depth) of the single-character unbounded repeats that may
+    # have matched just before the current item: characters are None for
+    # ".", depth counts the overlapping repeats chained up to that one
+    pending: List[Tuple[Optional[FrozenSet[int]], int]] = []
+    for op, av in items:
+        repeat = _as_repeat(op, av)
+        if repeat is not None:
+            low, high, body = repeat
+            unbounded = high == sre_parse.MAXREPEAT or high > _UNBOUNDED_REPEAT
+            if unbounded and context is not None:
+                return "nested unbounded quantifier"
+            if high > max(low, 1) and context == _UNBOUNDED:
+                return "variable-length quantifier nested in an unbounded quantifier"
+            if unbounded and _has_ambiguous_branch(body):
+                return "quantified alternatives with overlapping prefixes"
+            if unbounded and _is_single_char(body):
+                chars = _first_chars(body)  # None for "."
+                depth = 1 + max(
+                    (d for c, d in pending if c is None or chars is None or c & chars), default=0
+                )
+                if depth >= _MAX_OVERLAPPING_REPEATS:
+                    return "adjacent unbounded quantifiers over overlapping characters"
+                if low > 0:
+                    # A mandatory repeat stands in for the repeats before it
+                    pending = [(chars, depth)]
+                else:
+                    pending.append((chars, depth))
+            elif unbounded or low > 0:
+                pending = []
+
+            # A repeated body with a mandatory delimiter (e.g. "([a-z]+\.)*")
+            # can only split the input one way, so inner repeats are safe
+            inner = context
+            if high > 1 and context != _UNBOUNDED and not _is_delimited(body):
+                inner = _UNBOUNDED if unbounded else _BOUNDED
+            problem = _scan(body, inner)
+        else:
+            if op not in (sre_parse.AT, sre_parse.ASSERT, sre_parse.ASSERT_NOT):
+                pending = []
+            if op == sre_parse.SUBPATTERN:
+                problem = _scan(av[-1], context)
+            elif op == sre_parse.BRANCH:
+                problem = next(filter(None, (_scan(branch, context) for branch in av[1])), None)
+            elif op in (sre_parse.ASSERT, sre_parse.ASSERT_NOT):
+                problem = _scan(av[1], context)
+            elif op == sre_parse.GROUPREF_EXISTS:
+                problem = _scan(av[1], context) or (_scan(av[2], context) if av[2] else None)
+            else:
+                # Possessive repeats and atomic groups never backtrack into their body
+                problem = None
+        if problem:
+            return problem
+    return None
+
+
+def _is_single_char(items) -> bool:
+    """Whether a sequence is one character, class or "."."""
+    return len(items) == 1 and items[0][0] in (sre_parse.LITERAL, sre_parse.IN, sre_parse.ANY)
+
+
+def _as_repeat(op, av) -> Optional[Tuple[int, int, Any]]:
+    """(low, high, body) of a repeat, looking through groups that only wrap one."""
+    while op == sre_parse.SUBPATTERN and len(av[-1]) == 1:
+        op, av = av[-1][0]
+    return av if op in _REPEATS else None
+
+
+def _is_delimited(items) -> bool:
+    """
+    Whether a sequence has a required character that none of its unbounded
+    repeats can consume.
+    """
+    if len(items) == 1 and items[0][0] == sre_parse.SUBPATTERN:
+        return _is_delimited(items[0][1][-1])
+
+    repeated: Set[int] = set()
+    required: List[FrozenSet[int]] = []
+    for op, av in items:
+        if op in _REPEATS:
+            chars = _first_chars(av[2]) if len(av[2]) == 1 else None
+            if chars is None:
+                return False
+            repeated |= chars
+        elif op in (sre_parse.LITERAL, sre_parse.IN):
+            chars = _first_chars([(op, av)])
+            if chars is not None:
+                required.append(chars)
+        elif op not in (sre_parse.AT, sre_parse.ASSERT, sre_parse.ASSERT_NOT):
+            return False
+    return any(not chars & repeated for chars in required)
+
+
+def _has_ambiguous_branch(items) -> bool:
+    """Whether a repeated body contains alternatives with overlapping first characters."""
+    for op, av in items:
+        if op == sre_parse.BRANCH:
+            firsts = [_first_chars(branch) for branch in av[1]]
+            for i, first in enumerate(firsts):
+                for other in firsts[i + 1:]:
+                    if first is None or other is None or first & other:
+                        return True
+        elif op == sre_parse.SUBPATTERN and _has_ambiguous_branch(av[-1]):
+            return True
+    return False
+
+
+# ASCII members of the character class escapes
+_CATEGORY_CHARS = {
+    sre_parse.CATEGORY_DIGIT: frozenset(range(48, 58)),
+    sre_parse.CATEGORY_WORD: frozenset(
+        [*range(48, 58), *range(65, 91), *range(97, 123), 95]
+    ),
+    sre_parse.CATEGORY_SPACE: frozenset(b" \t\n\r\f\v"),
+}
+
+
+def _first_chars(items) -> Optional[FrozenSet[int]]:
+    """Code points a sequence can start with, or None if unknown or empty-matching."""
+    if not items:
+        return None
+    op, av = items[0]
+    if op == sre_parse.LITERAL:
+        return frozenset((av,))
+    if op == sre_parse.IN:
+        chars: Set[int] = set()
+        for set_op, set_av in av:
+            if set_op == sre_parse.LITERAL:
+                chars.add(set_av)
+            elif set_op == sre_parse.RANGE and set_av[1] - set_av[0] <= 0xFFFF:
+                chars.update(range(set_av[0], set_av[1] + 1))
+            elif set_op == sre_parse.CATEGORY and set_av in _CATEGORY_CHARS:
+                chars.update(_CATEGORY_CHARS[set_av])
+            else:
+                return None
+        return frozenset(chars)
+    if op == sre_parse.SUBPATTERN:
+        return _first_chars(av[-1])
+    if op == sre_parse.BRANCH:
+        union: Set[int] = set()
+        for branch in av[1]:
+            first = _first_chars(branch)
+            if first is None:
+                return None
+            union |= first
+        return frozenset(union)
+    if op in _REPEATS and av[0] > 0:
+        return _first_chars(av[2])
+    return None
+
+
+def iter_schema_patterns(schema: FormSchema) -> Iterator[Tuple[str, str]]:
+    """Yield (param name, pattern) for every regex declared in a schema."""
+    for category in schema.paramCategories:
+        for param in category.params:
+            pattern: Optional[str] = getattr(param.content, "pattern", None)
+            if pattern:
+                yield param.name, pattern
+            for rule in param.x_validation or []:
+                if rule.pattern:
+                    yield param.name, rule.pattern
+
+
+# Shared pattern store used by the validation engine
+PATTERN_CACHE = PatternCache()
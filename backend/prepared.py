@@ -0,0 +1,130 @@
+"""
+Pre-serialized HTTP responses.
+Static payloads (form schemas, option lists) are encoded to JSON bytes once,
+tagged with a content-hash ETag and optionally pre-compressed, so serving
+them is a lookup instead of a pydantic walk.
+"""
+
+import gzip
+import hashlib
+import json
+from functools import lru_cache
+from typing import Any, Dict, FrozenSet, Optional
+
+from fastapi import Request, Response
+from pydantic import BaseModel
+
+try:
+    import brotli
+except ImportError:  # Brotli variants are optional
+    brotli = None
+
+
+# Payloads smaller than this are not worth compressing
+MIN_COMPRESS_SIZE = 512
+
+
+# ============================================================================
+# Prepared Response
+# ============================================================================
+
+class PreparedResponse:
+    """JSON body encoded once, with ETag and compressed variants."""
+    __slots__ = ("body", "etag", "gzip", "brotli", "cache_control", "headers")
+
+    def __init__(self, body: bytes, cache_control: Optional[str] = None, headers: Optional[Dict[str, str]] = None):
+        self.body = body
+        self.etag = f'"{hashlib.sha256(body).hexdigest()[:32]}"'
+        self.cache_control = cache_control
+        self.headers = headers or {}
+        self.gzip: Optional[bytes] = None
+        self.brotli: Optional[bytes] = None
+
+        if len(body) >= MIN_COMPRESS_SIZE:
+            self.gzip = gzip.compress(body, compresslevel=9, mtime=0)
+            if brotli is not None:
+                self.brotli = brotli.compress(body, quality=11)
+
+    @classmethod
+    def from_model(
+        cls,
+        model: BaseModel,
+        cache_control: Optional[str] = None,
+        headers: Optional[Dict[str, str]] = None
+    ) -> "PreparedResponse":
+        """Serialize a pydantic model the same way FastAPI would."""
+        return cls(model.model_dump_json(by_alias=True).encode("utf-8"), cache_control, headers)
+
+    @classmethod
+    def from_content(cls, content: Any, cache_control: Optional[str] = None) -> "PreparedResponse":
+        """Serialize plain JSON-compatible content."""
+        body = json.dumps(content, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+        return cls(body, cache_control)
+
+    def respond(self, request: Request) -> Response:
+        """Build the response, honouring If-None-Match and Accept-Encoding."""
+        headers: Dict[str, str] = {"ETag": self.etag, "Vary": "Accept-Encoding", **self.headers}
+        if self.cache_control:
+            headers["Cache-Control"] = self.cache_control
+
+        if etag_matches(request.headers.get("if-none-match"), self.etag):
+            return Response(status_code=304, headers=headers)
+
+        body = self.body
+        accepted = accepted_encodings(request.headers.get("accept-encoding", ""))
+        if self.brotli is not None and "br" in accepted:
+            body = self.brotli
+            headers["Content-Encoding"] = "br"
+        elif self.gzip is not None and "gzip" in accepted:
+            body = self.gzip
+            headers["Content-Encoding"] = "gzip"
+
+        return Response(content=body, media_type="application/json", headers=headers)
+
+
+# ============================================================================
+# Helpers
+# ============================================================================
+
+@lru_cache(maxsize=256)
+def accepted_encodings(accept_encoding: str) -> FrozenSet[str]:
+    """
+    Content codings an Accept-Encoding header allows: those listed with a
+    non-zero q-value, plus br and gzip when "*" is allowed and they are not
+    listed themselves.
+    """
+    weights: Dict[str, float] = {}
+    for item in accept_encoding.split(","):
+        coding, *params = item.split(";")
+        coding = coding.strip().lower()
+        if not coding:
+            continue
+        q = 1.0
+        for param in params:
+            name, _, value = param.strip().partition("=")
+            if name.strip().lower() == "q":
+                try:
+                    q = float(value)
+                except ValueError:
+                    q = 0.0
+        weights[coding] = q
+
+    accepted = {coding for coding, q in weights.items() if q > 0}
+    if weights.get("*", 0) > 0:
+        accepted.update(coding for coding in ("br", "gzip") if coding not in weights)
+    return frozenset(accepted)
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Check an If-None-Match header against an ETag (weak comparison)."""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate.startswith("W/"):
+            candidate = candidate[2:]
+        if candidate == etag:
+            return True
+    return False
@@ -0,0 +1,325 @@
+"""
+Schema registry with lazy loading, hot reload and version history.
+Schemas come from built-in definitions or from a directory of JSON/YAML
+files (one `<schema_id>.json|.yaml|.yml` per form). Each schema is compiled
+on first access into an immutable CompiledSchema holding every derived
+artifact, and changed files are recompiled and swapped in atomically, so a
+request always sees one consistent version.
+
+Versions are content-addressed: a version is the hash of the schema's
+canonical JSON, so identical content always gets the same version. The last
+few versions of each form stay compiled, so submissions pinned to an older
+version are still validated against the rules they were filled in with.
+"""
+
+import hashlib
+import json
+import os
+import re
+import threading
+from collections import OrderedDict
+from typing import Callable, Dict, List, Optional, Tuple
+
+try:
+    import yaml
+except ImportError:  # YAML schema files are optional
+    yaml = None
+
+from dependencies import DependencyGraph, build_dependency_graph
+from limits import BodyLimits
+from models import FormSchema
+from patterns import PATTERN_CACHE
+from prepared import PreparedResponse
+from validation import ValidatorPlan, compile_schema
+
+
+# Schema files looked up for an ID, in order of preference
+SCHEMA_EXTENSIONS = (".json", ".yaml", ".yml")
+
+# IDs are used as file names, so keep them to a safe alphabet
+_SCHEMA_ID = re.compile(r"^[A-Za-z0-9][A-Za-z0-9_-]{0,127}$")
+
+# (path, mtime in ns) of a schema file, or (None, None) for a built-in schema
+_Source = Tuple[Optional[str], Optional[int]]
+
+# Compiled versions kept per form, including the current one
+DEFAULT_VERSION_HISTORY = 8
+
+
+class SchemaLoadError(ValueError):
+    """A schema exists but could not be loaded or compiled."""
+
+
+class SchemaVersionUnavailable(LookupError):
+    """A submission is pinned to a schema version that is no longer kept."""
+
+    def __init__(self, schema_id: str, version: str, current: str):
+        super().__init__(f"Schema '{schema_id}' version '{version}' is not available (current: '{current}')")
+        self.schema_id = schema_id
+        self.version = version
+        self.current = current
+
+
+def schema_digest(schema: FormSchema) -> str:
+    """Content hash of a schema's canonical JSON form."""
+    canonical = json.dumps(
+        schema.model_dump(by_alias=True, mode="json"),
+        sort_keys=True, separators=(",", ":"), ensure_ascii=False
+    )
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()[:16]
+
+
+class CompiledSchema:
+    """One version of a schema with its derived artifacts."""
+    __slots__ = ("schema_id", "version", "schema", "plan", "graph", "limits", "serialized")
+
+    def __init__(self, schema_id: str, schema: FormSchema, version: Optional[str] = None):
+        self.schema_id = schema_id
+        self.version = version or schema_digest(schema)
+        self.schema = schema
+        self.plan: ValidatorPlan = compile_schema(schema)
+        self.graph: DependencyGraph = build_dependency_graph(schema_id, schema)
+        self.limits = BodyLimits(schema)
+        self.serialized = PreparedResponse.from_model(schema, headers={"X-Schema-Version": self.version})
+
+
+# ============================================================================
+# Schema Registry
+# ============================================================================
+
+class SchemaRegistry:
+    """
+    Lazily compiled, hot-reloadable set of form schemas.
+
+    Files in `directory` take precedence over built-in schemas with the same
+    ID. refresh() (run periodically by the application) recompiles schemas
+    whose file changed and drops those whose file was removed; a file that
+    fails to load keeps the previous version in service and is retried only
+    once it changes again. The `history` most
+    recently used versions of each form stay compiled.
+    """
+
+    def __init__(
+        self,
+        builtins: Optional[Dict[str, FormSchema]] = None,
+        directory: Optional[str] = None,
+        history: int = DEFAULT_VERSION_HISTORY
+    ):
+        self.builtins = dict(builtins or {})
+        self.directory = directory
+        self.history = max(1, history)
+        self.loads = 0
+        self.reloads = 0
+        self.errors: Dict[str, str] = {}
+        self._entries: Dict[str, CompiledSchema] = {}
+        self._history: Dict[str, "OrderedDict[str, CompiledSchema]"] = {}
+        self._sources: Dict[str, _Source] = {}
+        # Source that last failed to load, with its error, per schema
+        self._failed: Dict[str, Tuple[_Source, str]] = {}
+        self._listeners: List[Callable[[List[FormSchema]], None]] = []
+        self._lock = threading.Lock()
+
+    def get(self, schema_id: str, version: Optional[str] = None) -> Optional[CompiledSchema]:
+        """
+        Compiled schema, loading it on first access: the current version,
+        or `version` if given and still kept. Returns None for unknown IDs;
+        raises SchemaLoadError if the schema exists but is invalid and
+        SchemaVersionUnavailable if the version is unknown or was evicted.
+        """
+        entry = self._entries.get(schema_id)
+        if entry is None:
+            if not _SCHEMA_ID.match(schema_id):
+                return None
+            with self._lock:
+                entry = self._entries.get(schema_id)
+                if entry is None:
+                    entry = self._load(schema_id)
+                if entry is None:
+                    return None
+        if version is None or version == entry.version:
+            return entry
+
+        with self._lock:
+            versions = self._history.get(schema_id)
+            pinned = versions.get(version) if versions else None
+            if pinned is None:
+                raise SchemaVersionUnavailable(schema_id, version, entry.version)
+            versions.move_to_end(version)
+            return pinned
+
+    def plan(self, schema_id: Optional[str], version: Optional[str] = None) -> Optional[ValidatorPlan]:
+        """Validator plan for a form version, or None for unknown forms."""
+        entry = self.get(schema_id, version) if schema_id else None
+        return entry.plan if entry is not None else None
+
+    def ids(self) -> List[str]:
+        """IDs of every available schema, loaded or not."""
+        ids = dict.fromkeys(self.builtins)
+        if self.directory and os.path.isdir(self.directory):
+            for file_name in sorted(os.listdir(self.directory)):
+                stem, ext = os.path.splitext(file_name)
+                if ext in SCHEMA_EXTENSIONS and _SCHEMA_ID.match(stem):
+                    ids[stem] = None
+        return list(ids)
+
+    def loaded(self) -> List[CompiledSchema]:
+        """Current versions of the compiled schemas."""
+        return list(self._entries.values())
+
+    def current_schemas(self) -> List[FormSchema]:
+        """
+        Current version of every loaded schema, plus built-in schemas not
+        loaded yet (which need no compiling), without loading anything.
+        """
+        schemas = dict(self.builtins)
+        schemas.update((schema_id, entry.schema) for schema_id, entry in self._entries.items())
+        return list(schemas.values())
+
+    def on_change(self, listener: Callable[[List[FormSchema]], None]) -> None:
+        """
+        Call `listener(current_schemas())` now and whenever a schema is
+        loaded, swapped or dropped. Listeners run with the registry lock held
+        and must not call back into the registry's loading methods.
+        """
+        self._listeners.append(listener)
+        listener(self.current_schemas())
+
+    def register(self, schema_id: str, schema: FormSchema) -> CompiledSchema:
+        """Compile and swap in a schema defined in code."""
+        with self._lock:
+            self.builtins[schema_id] = schema
+            entry = self._swap(schema_id, schema)
+            self._sources[schema_id] = (None, None)
+            return entry
+
+    def refresh(self) -> List[str]:
+        """
+        Reload file-backed schemas whose file changed or disappeared.
+        Returns the IDs that were swapped or dropped.
+        """
+        changed = []
+        for schema_id, entry in list(self._entries.items()):
+            source = self._source(schema_id)
+            failed = self._failed.get(schema_id)
+            if source == self._sources.get(schema_id) or (failed is not None and source == failed[0]):
+                continue
+            with self._lock:
+                if self._entries.get(schema_id) is not entry:
+                    continue
+                try:
+                    reloaded = self._load(schema_id)
+                    if reloaded is None:
+                        del self._entries[schema_id]
+                        del self._history[schema_id]
+                        del self._sources[schema_id]
+                        PATTERN_CACHE.unregister_schema(schema_id)
+                        self._notify()
+                    elif reloaded is entry:
+                        continue  # File touched but content unchanged
+                    self.reloads += 1
+                    changed.append(schema_id)
+                except SchemaLoadError:
+                    pass  # Keep serving the previous version; the error is in self.errors
+        return changed
+
+    def stats(self) -> Dict[str, object]:
+        """Loaded schema count, current versions, counters and current load errors."""
+        return {
+            "loaded": len(self._entries),
+            "versions": {schema_id: entry.version for schema_id, entry in self._entries.items()},
+            "compiled_versions": sum(len(versions) for versions in self._history.values()),
+            "history": self.history,
+            "loads": self.loads,
+            "reloads": self.reloads,
+            "errors": dict(self.errors),
+        }
+
+    # ------------------------------------------------------------------------
+    # Loading (called with the lock held)
+    # ------------------------------------------------------------------------
+
+    def _source(self, schema_id: str) -> Optional[_Source]:
+        """(path, mtime) of a schema's file, (None, None) for a built-in, or None."""
+        if self.directory and _SCHEMA_ID.match(schema_id):
+            for ext in SCHEMA_EXTENSIONS:
+                path = os.path.join(self.directory, schema_id + ext)
+                try:
+                    return path, os.stat(path).st_mtime_ns
+                except OSError:
+                    continue
+        if schema_id in self.builtins:
+            return None, None
+        return None
+
+    def _load(self, schema_id: str) -> Optional[CompiledSchema]:
+        """
+        Load and swap in a schema. A file that failed to load is not parsed
+        again until its modification time changes.
+        """
+        source = self._source(schema_id)
+        if source is None:
+            return None
+        failed = self._failed.get(schema_id)
+        if failed is not None and failed[0] == source:
+            raise SchemaLoadError(f"Schema '{schema_id}' could not be loaded: {failed[1]}")
+        path, _ = source
+        try:
+            schema = self.builtins[schema_id] if path is None else _read_schema_file(path)
+            entry = self._swap(schema_id, schema)
+        except (OSError, ValueError) as e:
+            self.errors[schema_id] = str(e)
+            self._failed[schema_id] = (source, str(e))
+            raise SchemaLoadError(f"Schema '{schema_id}' could not be loaded: {e}") from None
+        self._sources[schema_id] = source
+        self.errors.pop(schema_id, None)
+        self._failed.pop(schema_id, None)
+        return entry
+
+    def _swap(self, schema_id: str, schema: FormSchema) -> CompiledSchema:
+        """Make `schema` the current version, reusing it if already compiled."""
+        previous = self._entries.get(schema_id)
+        versions = self._history.setdefault(schema_id, OrderedDict())
+        version = schema_digest(schema)
+        if previous is not None and previous.version == version:
+            return previous
+
+        PATTERN_CACHE.register_schema(schema_id, schema)
+        entry = versions.get(version)
+        if entry is None:
+            try:
+                entry = CompiledSchema(schema_id, schema, version)
+            except ValueError:
+                if previous is not None:
+                    PATTERN_CACHE.register_schema(schema_id, previous.schema)
+                else:
+                    PATTERN_CACHE.unregister_schema(schema_id)
+                raise
+            self.loads += 1
+
+        versions[version] = entry
+        versions.move_to_end(version)
+        self._entries[schema_id] = entry
+        while len(versions) > self.history:
+            versions.popitem(last=False)
+        self._notify()
+        return entry
+
+    def _notify(self) -> None:
+        schemas = self.current_schemas()
+        for listener in self._listeners:
+            listener(schemas)
+
+
+def _read_schema_file(path: str) -> FormSchema:
+    """Parse a JSON or YAML schema file."""
+    with open(path, "rb") as f:
+        raw = f.read()
+    if path.endswith(".json"):
+        return FormSchema.model_validate_json(raw)
+    if yaml is None:
+        raise ValueError(f"{path}: install PyYAML to load YAML schemas")
+    try:
+        content = yaml.safe_load(raw)
+    except yaml.YAMLError as e:
+        raise ValueError(f"{path}: {e}") from None
+    return FormSchema.model_validate(content)
@@ -0,0 +1,497 @@
+"""
+Pluggable persistent storage for form submissions.
+The default backend is an append-optimised SQLite database in WAL mode whose
+writes are group-committed by a background thread.
+"""
+
+import json
+import queue
+import re
+import sqlite3
+import threading
+from abc import ABC, abstractmethod
+from bisect import bisect_right
+from concurrent.futures import Future
+from datetime import datetime, timezone
+from time import perf_counter
+from typing import Any, Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+
+
+# A stored submission as returned to API clients
+SubmissionRecord = Dict[str, Any]
+
+# An equality filter on a top-level key of the submission data
+DataFilter = Tuple[str, Any]
+
+_FILTER_KEY = re.compile(r"^[A-Za-z_][A-Za-z0-9_]*$")
+
+
+def utc_timestamp() -> str:
+    """Current UTC time in ISO 8601 format."""
+    return datetime.now(timezone.utc).isoformat()
+
+
+def parse_filter(expression: str) -> DataFilter:
+    """
+    Parse a "key=value" data filter. The value is decoded as JSON when it is
+    a number, boolean or null, and compared as a string otherwise.
+    """
+    key, sep, raw = expression.partition("=")
+    if not sep or not _FILTER_KEY.match(key):
+        raise ValueError(f"Invalid filter {expression!r}, expected key=value")
+    try:
+        value = json.loads(raw)
+    except ValueError:
+        value = raw
+    if isinstance(value, (list, dict, str)):
+        value = raw
+    return key, value
+
+
+# ============================================================================
+# Store Interface
+# ============================================================================
+
+class SubmissionStore(ABC):
+    """Storage backend for form submissions."""
+
+    @abstractmethod
+    def add(
+        self, form_id: Optional[str], data: Dict[str, Any], schema_version: Optional[str] = None
+    ) -> "Future[int]":
+        """
+        Queue a submission for storage, recording the schema version it was
+        validated against; the future resolves to its ID once durable.
+        """
+
+    @abstractmethod
+    def query(
+        self,
+        form_id: Optional[str] = None,
+        after: int = 0,
+        limit: int = 100,
+        filters: Sequence[DataFilter] = ()
+    ) -> List[SubmissionRecord]:
+        """Return up to `limit` submissions with ID greater than `after`, in ID order."""
+
+    @abstractmethod
+    def count(self, form_id: Optional[str] = None, filters: Sequence[DataFilter] = ()) -> int:
+        """Return the number of stored submissions matching the filters."""
+
+    @abstractmethod
+    def claim_unique(self, scope: str, value: str) -> bool:
+        """Atomically reserve a value within a scope; False if already taken."""
+
+    @abstractmethod
+    def release_unique(self, scope: str, value: str) -> None:
+        """Release a reserved value (e.g. when the submission that claimed it fails)."""
+
+    @abstractmethod
+    def has_unique(self, scope: str, value: str) -> bool:
+        """Whether a value is currently reserved within a scope."""
+
+    @abstractmethod
+    def unique_since(self, scope: str, after: int = 0, limit: int = 10000) -> List[Tuple[int, str]]:
+        """
+        Values claimed in a scope after sequence number `after`, as
+        (sequence, value) pairs in claim order. Released values stay in the
+        sequence, so callers building caches must confirm with has_unique().
+        """
+
+    def iter(self, form_id: Optional[str] = None, batch_size: int = 1000) -> Iterator[SubmissionRecord]:
+        """Iterate over submissions in ID order without loading them all at once."""
+        after = 0
+        while True:
+            page = self.query(form_id, after=after, limit=batch_size)
+            yield from page
+            if len(page) < batch_size:
+                return
+            after = page[-1]["submissionId"]
+
+    def close(self) -> None:
+        """Flush pending writes and release resources."""
+
+
+# ============================================================================
+# In-Memory Backend
+# ============================================================================
+
+class MemorySubmissionStore(SubmissionStore):
+    """Process-local store, useful for tests and development."""
+
+    def __init__(self):
+        self._records: List[SubmissionRecord] = []
+        self._by_form: Dict[Optional[str], List[SubmissionRecord]] = {}
+        self._unique: Dict[str, set] = {}
+        self._claims: Dict[str, List[str]] = {}
+        self._lock = threading.Lock()
+
+    def add(
+        self, form_id: Optional[str], data: Dict[str, Any], schema_version: Optional[str] = None
+    ) -> "Future[int]":
+        with self._lock:
+            submission_id = len(self._records) + 1
+            record = {
+                "submissionId": submission_id,
+                "formId": form_id,
+                "schemaVersion": schema_version,
+                "data": data,
+                "timestamp": utc_timestamp(),
+            }
+            self._records.append(record)
+            self._by_form.setdefault(form_id, []).append(record)
+        future: "Future[int]" = Future()
+        future.set_result(submission_id)
+        return future
+
+    def query(
+        self,
+        form_id: Optional[str] = None,
+        after: int = 0,
+        limit: int = 100,
+        filters: Sequence[DataFilter] = ()
+    ) -> List[SubmissionRecord]:
+        records = self._records if form_id is None else self._by_form.get(form_id, [])
+        start = bisect_right(records, after, key=lambda record: record["submissionId"])
+        if not filters:
+            return records[start:start + limit]
+
+        page = []
+        for index in range(start, len(records)):
+            record = records[index]
+            if _matches(record["data"], filters):
+                page.append(record)
+                if len(page) == limit:
+                    break
+        return page
+
+    def count(self, form_id: Optional[str] = None, filters: Sequence[DataFilter] = ()) -> int:
+        records = self._records if form_id is None else self._by_form.get(form_id, [])
+        if not filters:
+            return len(records)
+        return sum(1 for record in records if _matches(record["data"], filters))
+
+    def claim_unique(self, scope: str, value: str) -> bool:
+        with self._lock:
+            values = self._unique.setdefault(scope, set())
+            if value in values:
+                return False
+            values.add(value)
+            self._claims.setdefault(scope, []).append(value)
+            return True
+
+    def release_unique(self, scope: str, value: str) -> None:
+        with self._lock:
+            self._unique.get(scope, set()).discard(value)
+
+    def has_unique(self, scope: str, value: str) -> bool:
+        return value in self._unique.get(scope, ())
+
+    def unique_since(self, scope: str, after: int = 0, limit: int = 10000) -> List[Tuple[int, str]]:
+        claims = self._claims.get(scope, [])
+        return list(enumerate(claims[after:after + limit], start=after + 1))
+
+
+def _matches(data: Dict[str, Any], filters: Sequence[DataFilter]) -> bool:
+    """Whether submission data satisfies every equality filter."""
+    for key, value in filters:
+        if data.get(key) != value:
+            return False
+    return True
+
+
+# ============================================================================
+# SQLite Backend
+# ============================================================================
+
+_SQLITE_SCHEMA = """
+CREATE TABLE IF NOT EXISTS submissions (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    form_id TEXT,
+    data TEXT NOT NULL,
+    timestamp TEXT NOT NULL,
+    schema_version TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_submissions_form_id ON submissions (form_id, id);
+CREATE INDEX IF NOT EXISTS idx_submissions_timestamp ON submissions (timestamp);
+CREATE TABLE IF NOT EXISTS unique_values (
+    scope TEXT NOT NULL,
+    value TEXT NOT NULL,
+    PRIMARY KEY (scope, value)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS unique_claims (
+    seq INTEGER PRIMARY KEY AUTOINCREMENT,
+    scope TEXT NOT NULL,
+    value TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_unique_claims_scope ON unique_claims (scope, seq);
+"""
+
+
+class SQLiteSubmissionStore(SubmissionStore):
+    """
+    SQLite store in WAL mode, safe to share between uvicorn workers.
+
+    Writes are queued and committed in batches by a background thread: while
+    one batch commits, new submissions queue up and share the next fsync. Each submission's future resolves
+    only after its batch has committed. Reads and unique-value claims use one
+    connection per thread; claims rely on the primary key of `unique_values`,
+    so they are atomic across threads and worker processes.
+    """
+
+    def __init__(self, path: str, batch_size: int = 256):
+        self.path = path
+        self.batch_size = batch_size
+        self._local = threading.local()
+        self._queue: "queue.Queue[Optional[Tuple[Optional[str], str, str, Optional[str], Future]]]" = queue.Queue()
+
+        connection = self._connect()
+        connection.executescript(_SQLITE_SCHEMA)
+        # Databases created before submissions were pinned to schema versions
+        columns = {row[1] for row in connection.execute("PRAGMA table_info(submissions)")}
+        if "schema_version" not in columns:
+            connection.execute("ALTER TABLE submissions ADD COLUMN schema_version TEXT")
+        # Databases whose unique values predate the claim log
+        connection.execute(
+            "INSERT INTO unique_claims (scope, value) SELECT scope, value FROM unique_values"
+            " WHERE NOT EXISTS (SELECT 1 FROM unique_claims)"
+        )
+        connection.commit()
+
+        self._writer = threading.Thread(target=self._write_loop, name="submission-writer", daemon=True)
+        self._writer.start()
+
+    def _connect(self) -> sqlite3.Connection:
+        """Open a connection with WAL journaling and a busy timeout."""
+        connection = sqlite3.connect(self.path, timeout=30)
+        connection.execute("PRAGMA journal_mode=WAL")
+        connection.execute("PRAGMA synchronous=NORMAL")
+        connection.execute("PRAGMA busy_timeout=30000")
+        return connection
+
+    @property
+    def _reader(self) -> sqlite3.Connection:
+        """Per-thread connection for reads and unique-value claims."""
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            connection = self._local.connection = self._connect()
+        return connection
+
+    def add(
+        self, form_id: Optional[str], data: Dict[str, Any], schema_version: Optional[str] = None
+    ) -> "Future[int]":
+        if not self._writer.is_alive():
+            raise RuntimeError("Submission store is closed")
+        future: "Future[int]" = Future()
+        self._queue.put((form_id, json.dumps(data, ensure_ascii=False), utc_timestamp(), schema_version, future))
+        return future
+
+    def _write_loop(self) -> None:
+        """Drain the write queue, committing up to batch_size rows per transaction."""
+        connection = self._connect()
+        while True:
+            item = self._queue.get()
+            if item is None:
+                break
+
+            batch = [item]
+            stop = False
+            while len(batch) < self.batch_size:
+                try:
+                    item = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if item is None:
+                    stop = True
+                    break
+                batch.append(item)
+
+            self._write_batch(connection, batch)
+            if stop:
+                break
+        connection.close()
+
+    def _write_batch(self, connection: sqlite3.Connection, batch: list) -> None:
+        """Insert a batch of rows in one transaction and resolve their futures."""
+        try:
+            ids = []
+            with connection:
+                for form_id, data, timestamp, schema_version, _ in batch:
+                    cursor = connection.execute(
+                        "INSERT INTO submissions (form_id, data, timestamp, schema_version) VALUES (?, ?, ?, ?)",
+                        (form_id, data, timestamp, schema_version)
+                    )
+                    ids.append(cursor.lastrowid)
+        except Exception as e:
+            for *_, future in batch:
+                future.set_exception(e)
+            return
+        for (*_, future), submission_id in zip(batch, ids):
+            future.set_result(submission_id)
+
+    @staticmethod
+    def _to_record(row: Tuple[int, Optional[str], str, str, Optional[str]]) -> SubmissionRecord:
+        return {
+            "submissionId": row[0],
+            "formId": row[1],
+            "schemaVersion": row[4],
+            "data": json.loads(row[2]),
+            "timestamp": row[3],
+        }
+
+    @staticmethod
+    def _where(
+        form_id: Optional[str],
+        filters: Sequence[DataFilter],
+        after: int = 0
+    ) -> Tuple[str, List[Any]]:
+        """Build the WHERE clause; form_id and id use the (form_id, id) index."""
+        clauses: List[str] = []
+        params: List[Any] = []
+        if form_id is not None:
+            clauses.append("form_id = ?")
+            params.append(form_id)
+        if after:
+            clauses.append("id > ?")
+            params.append(after)
+        for key, value in filters:
+            clauses.append("json_extract(data, ?) IS ?")
+            params.extend((f'$."{key}"', value))
+        return " AND ".join(clauses) or "1", params
+
+    def query(
+        self,
+        form_id: Optional[str] = None,
+        after: int = 0,
+        limit: int = 100,
+        filters: Sequence[DataFilter] = ()
+    ) -> List[SubmissionRecord]:
+        where, params = self._where(form_id, filters, after)
+        rows = self._reader.execute(
+            f"SELECT id, form_id, data, timestamp, schema_version FROM submissions WHERE {where} ORDER BY id LIMIT ?",
+            (*params, limit)
+        ).fetchall()
+        return [self._to_record(row) for row in rows]
+
+    def count(self, form_id: Optional[str] = None, filters: Sequence[DataFilter] = ()) -> int:
+        where, params = self._where(form_id, filters)
+        return self._reader.execute(f"SELECT COUNT(*) FROM submissions WHERE {where}", params).fetchone()[0]
+
+    def claim_unique(self, scope: str, value: str) -> bool:
+        connection = self._reader
+        with connection:
+            cursor = connection.execute(
+                "INSERT OR IGNORE INTO unique_values (scope, value) VALUES (?, ?)", (scope, value)
+            )
+            claimed = cursor.rowcount == 1
+            if claimed:
+                connection.execute("INSERT INTO unique_claims (scope, value) VALUES (?, ?)", (scope, value))
+        return claimed
+
+    def release_unique(self, scope: str, value: str) -> None:
+        connection = self._reader
+        with connection:
+            connection.execute("DELETE FROM unique_values WHERE scope = ? AND value = ?", (scope, value))
+
+    def has_unique(self, scope: str, value: str) -> bool:
+        row = self._reader.execute(
+            "SELECT 1 FROM unique_values WHERE scope = ? AND value = ?", (scope, value)
+        ).fetchone()
+        return row is not None
+
+    def unique_since(self, scope: str, after: int = 0, limit: int = 10000) -> List[Tuple[int, str]]:
+        return self._reader.execute(
+            "SELECT seq, value FROM unique_claims WHERE scope = ? AND seq > ? ORDER BY seq LIMIT ?",
+            (scope, after, limit)
+        ).fetchall()
+
+    def close(self) -> None:
+        if self._writer.is_alive():
+            self._queue.put(None)
+            self._writer.join()
+
+
+# ============================================================================
+# Instrumentation
+# ============================================================================
+
+class TimedSubmissionStore(SubmissionStore):
+    """
+    Wraps a store and reports each operation's duration to
+    `observe(operation, seconds)`. add() is timed until its future
+    resolves, so group-commit waits are included.
+    """
+
+    def __init__(self, store: SubmissionStore, observe: Callable[[str, float], None]):
+        self.store = store
+        self.observe = observe
+
+    def add(
+        self, form_id: Optional[str], data: Dict[str, Any], schema_version: Optional[str] = None
+    ) -> "Future[int]":
+        start = perf_counter()
+        future = self.store.add(form_id, data, schema_version)
+        future.add_done_callback(lambda _: self.observe("add", perf_counter() - start))
+        return future
+
+    def query(
+        self,
+        form_id: Optional[str] = None,
+        after: int = 0,
+        limit: int = 100,
+        filters: Sequence[DataFilter] = ()
+    ) -> List[SubmissionRecord]:
+        start = perf_counter()
+        try:
+            return self.store.query(form_id, after, limit, filters)
+        finally:
+            self.observe("query", perf_counter() - start)
+
+    def count(self, form_id: Optional[str] = None, filters: Sequence[DataFilter] = ()) -> int:
+        start = perf_counter()
+        try:
+            return self.store.count(form_id, filters)
+        finally:
+            self.observe("count", perf_counter() - start)
+
+    def claim_unique(self, scope: str, value: str) -> bool:
+        start = perf_counter()
+        try:
+            return self.store.claim_unique(scope, value)
+        finally:
+            self.observe("claim_unique", perf_counter() - start)
+
+    def release_unique(self, scope: str, value: str) -> None:
+        start = perf_counter()
+        try:
+            self.store.release_unique(scope, value)
+        finally:
+            self.observe("release_unique", perf_counter() - start)
+
+    def has_unique(self, scope: str, value: str) -> bool:
+        start = perf_counter()
+        try:
+            return self.store.has_unique(scope, value)
+        finally:
+            self.observe("has_unique", perf_counter() - start)
+
+    def unique_since(self, scope: str, after: int = 0, limit: int = 10000) -> List[Tuple[int, str]]:
+        return self.store.unique_since(scope, after, limit)
+
+    def close(self) -> None:
+        self.store.close()
+
+
+# ============================================================================
+# Factory
+# ============================================================================
+
+def create_store(url: str) -> SubmissionStore:
+    """
+    Create a store from a URL: "memory://" or "sqlite:///path/to/file.db".
+    """
+    if url.startswith("memory://"):
+        return MemorySubmissionStore()
+    if url.startswith("sqlite:///"):
+        return SQLiteSubmissionStore(url[len("sqlite:///"):])
+    raise ValueError(f"Unsupported submission store URL: {url!r}")
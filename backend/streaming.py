@@ -0,0 +1,81 @@
+"""
+Streaming helpers for NDJSON request and response bodies.
+Lets an endpoint consume a chunked request body record by record while
+streaming results back, with memory bounded by the largest single record.
+"""
+
+from typing import AsyncIterator, Optional, Tuple
+
+from starlette.responses import StreamingResponse
+from starlette.types import Receive, Scope, Send
+
+
+# Default upper bound for a single NDJSON record
+MAX_RECORD_BYTES = 1024 * 1024
+
+
+# ============================================================================
+# NDJSON Reader
+# ============================================================================
+
+async def iter_ndjson_records(
+    chunks: AsyncIterator[bytes],
+    max_record_bytes: int = MAX_RECORD_BYTES
+) -> AsyncIterator[Tuple[int, Optional[bytes]]]:
+    """
+    Split a chunked body into NDJSON records as chunks arrive.
+
+    Yields (line number, record bytes). Blank lines are skipped. A record
+    longer than `max_record_bytes` is discarded without being buffered and
+    yielded as None so the caller can report it.
+    """
+    buffer = bytearray()
+    line_number = 0
+    oversized = False
+
+    async for chunk in chunks:
+        start = 0
+        while True:
+            newline = chunk.find(b"\n", start)
+            end = len(chunk) if newline == -1 else newline
+            if not oversized:
+                buffer += chunk[start:end]
+                if len(buffer) > max_record_bytes:
+                    oversized = True
+                    buffer.clear()
+            if newline == -1:
+                break
+
+            line_number += 1
+            if oversized:
+                yield line_number, None
+            elif buffer.strip():
+                yield line_number, bytes(buffer)
+            buffer.clear()
+            oversized = False
+            start = newline + 1
+
+    if oversized:
+        yield line_number + 1, None
+    elif buffer.strip():
+        yield line_number + 1, bytes(buffer)
+
+
+# ============================================================================
+# Duplex Streaming Response
+# ============================================================================
+
+class DuplexStreamingResponse(StreamingResponse):
+    """
+    Streaming response whose body iterator reads the request body.
+
+    Starlette's StreamingResponse listens for client disconnects by calling
+    `receive()` concurrently, which would swallow request body messages.
+    Here the body iterator is the only consumer of `receive`, and a client
+    disconnect surfaces as ClientDisconnect from `request.stream()`.
+    """
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        await self.stream_response(send)
+        if self.background is not None:
+            await self.background()
@@ -0,0 +1,728 @@
+"""
+Schema compiler and validation engine.
+Compiles each FormSchema into a flat validator plan once, so validating a
+submission only runs precomputed checks instead of re-walking the schema.
+"""
+
+from datetime import date, datetime, time, timezone
+from time import perf_counter
+from typing import Any, Callable, Dict, FrozenSet, Iterable, List, Optional, Sequence, Tuple
+
+from columnar import use_columnar, validate_columns
+from expressions import Expression, compile_expression
+from models import EnumValue, FormSchema, FormSubmission, Param, ValidationError
+from patterns import PATTERN_CACHE, PatternTimeout
+
+
+# A check receives the submitted value and returns an error, or None if valid.
+Check = Callable[[Any], Optional[ValidationError]]
+
+# A rule check receives the whole submission data (for cross-field rules).
+RuleCheck = Callable[[Dict[str, Any]], Optional[ValidationError]]
+
+# Sentinel for fields that are absent from the submission data.
+_MISSING = object()
+
+
+# ============================================================================
+# Validator Plan
+# ============================================================================
+
+class FieldPlan:
+    """
+    Precomputed checks for a single parameter. `visible` is the compiled
+    x-visibility condition (None when always visible); `rules` are
+    cross-field checks run against the whole submission.
+    """
+    __slots__ = ("name", "required_error", "checks", "visible", "rules")
+
+    def __init__(
+        self,
+        name: str,
+        required_error: Optional[ValidationError],
+        checks: Tuple[Check, ...],
+        visible: Optional[Expression] = None,
+        rules: Tuple[RuleCheck, ...] = ()
+    ):
+        self.name = name
+        self.required_error = required_error
+        self.checks = checks
+        self.visible = visible
+        self.rules = rules
+
+
+class ValidatorPlan:
+    """Flat, precompiled validation plan for one form schema."""
+    __slots__ = ("fields",)
+
+    def __init__(self, fields: Tuple[FieldPlan, ...]):
+        self.fields = fields
+
+    def validate(self, data: Dict[str, Any]) -> List[ValidationError]:
+        """Run the plan against submission data and return all errors."""
+        return self._run(self.fields, data)
+
+    def validate_fields(self, data: Dict[str, Any], names: Iterable[str]) -> List[ValidationError]:
+        """Run only the checks of the named fields (in plan order)."""
+        names = set(names)
+        return self._run([field for field in self.fields if field.name in names], data)
+
+    def profile(self, data: Dict[str, Any], observe: Callable[[str, float], None]) -> List[ValidationError]:
+        """
+        Like validate(), also reporting the seconds spent in each check to
+        `observe(kind, seconds)`; see check_kind() for the kinds.
+        """
+        errors: List[ValidationError] = []
+        for field in self.fields:
+            if field.visible is not None:
+                start = perf_counter()
+                visible = field.visible(data)
+                observe("visibility", perf_counter() - start)
+                if not visible:
+                    continue
+            value = data.get(field.name, _MISSING)
+            if value is _MISSING:
+                if field.required_error is not None:
+                    errors.append(field.required_error)
+                continue
+            for check in field.checks:
+                start = perf_counter()
+                error = check(value)
+                observe(check_kind(check), perf_counter() - start)
+                if error is not None:
+                    errors.append(error)
+            for rule in field.rules:
+                start = perf_counter()
+                error = rule(data)
+                observe(check_kind(rule), perf_counter() - start)
+                if error is not None:
+                    errors.append(error)
+        return errors
+
+    @staticmethod
+    def _run(fields: Sequence[FieldPlan], data: Dict[str, Any]) -> List[ValidationError]:
+        errors: List[ValidationError] = []
+        for field in fields:
+            if field.visible is not None and not field.visible(data):
+                continue
+            value = data.get(field.name, _MISSING)
+            if value is _MISSING:
+                if field.required_error is not None:
+                    errors.append(field.required_error)
+                continue
+            for check in field.checks:
+                error = check(value)
+                if error is not None:
+                    errors.append(error)
+            for rule in field.rules:
+                error = rule(data)
+                if error is not None:
+                    errors.append(error)
+        return errors
+
+
+def check_kind(check: Callable[..., Optional[ValidationError]]) -> str:
+    """
+    Kind of a compiled check, from its function name: "pattern" for
+    check_pattern, "rule" for x-validation rules, and so on; "custom" for
+    checks not named check_*.
+    """
+    name = getattr(check, "__name__", "")
+    return name[len("check_"):] if name.startswith("check_") else "custom"
+
+
+# ============================================================================
+# Content Check Compilers
+# ============================================================================
+
+def _vector(kind: str, **spec: Any) -> Callable[[Check], Check]:
+    """Tag a check with an equivalent bulk operation for the columnar validator."""
+    def tag(check: Check) -> Check:
+        check.vector = (kind, spec)
+        return check
+    return tag
+
+
+def _pattern_timeout_error(param: Param) -> ValidationError:
+    """Error for values a guarded pattern gave up on (too long or too slow)."""
+    return ValidationError(
+        field=param.name,
+        message=f"{param.description} could not be checked against its format",
+        code="pattern_timeout"
+    )
+
+
+def _max_length(param: Param) -> Optional[int]:
+    """maxLength of string content; longer values are never matched against regexes."""
+    return param.content.maxLength if param.content.type == "string" else None
+
+
+def _compile_string(param: Param) -> List[Check]:
+    """Build length and pattern checks for string content."""
+    content = param.content
+    checks: List[Check] = []
+
+    if content.minLength:
+        min_length = content.minLength
+        min_length_error = ValidationError(
+            field=param.name,
+            message=f"{param.description} must be at least {min_length} characters",
+            code="minLength"
+        )
+
+        @_vector("min_length", min_length=min_length, error=min_length_error)
+        def check_min_length(value: Any) -> Optional[ValidationError]:
+            if len(str(value)) < min_length:
+                return min_length_error
+            return None
+
+        checks.append(check_min_length)
+
+    max_length = _max_length(param)
+    if max_length is not None:
+        max_length_error = ValidationError(
+            field=param.name,
+            message=f"{param.description} must be at most {max_length} characters",
+            code="maxLength"
+        )
+
+        @_vector("max_length", max_length=max_length, error=max_length_error)
+        def check_max_length(value: Any) -> Optional[ValidationError]:
+            if len(str(value)) > max_length:
+                return max_length_error
+            return None
+
+        checks.append(check_max_length)
+
+    if content.pattern:
+        match = PATTERN_CACHE.get(content.pattern).match
+        pattern_error = ValidationError(
+            field=param.name,
+            message=f"{param.description} has invalid format",
+            code="pattern"
+        )
+
+        timeout_error = _pattern_timeout_error(param)
+
+        @_vector(
+            "pattern", match=match, max_length=max_length,
+            error=pattern_error, timeout_error=timeout_error
+        )
+        def check_pattern(value: Any) -> Optional[ValidationError]:
+            text = str(value)
+            if max_length is not None and len(text) > max_length:
+                return None  # Already rejected by maxLength; skip the regex
+            try:
+                if not match(text):
+                    return pattern_error
+            except PatternTimeout:
+                return timeout_error
+            return None
+
+        checks.append(check_pattern)
+
+    return checks
+
+
+def _compile_number(param: Param) -> List[Check]:
+    """Build type, bound and integer checks for number/integer content."""
+    content = param.content
+    min_value = content.min
+    max_value = content.max
+
+    type_error = ValidationError(
+        field=param.name,
+        message=f"{param.description} must be a number",
+        code="type"
+    )
+    min_error = ValidationError(
+        field=param.name,
+        message=f"{param.description} must be at least {min_value}",
+        code="min"
+    )
+    max_error = ValidationError(
+        field=param.name,
+        message=f"{param.description} must be at most {max_value}",
+        code="max"
+    )
+
+    integer = content.type == "integer"
+    integer_error = ValidationError(
+        field=param.name,
+        message=f"{param.description} must be a whole number",
+        code="integer"
+    )
+
+    @_vector(
+        "number", min=min_value, max=max_value, integer=integer,
+        type_error=type_error, min_error=min_error, max_error=max_error, integer_error=integer_error
+    )
+    def check_number(value: Any) -> Optional[ValidationError]:
+        try:
+            num_value = float(value)
+        except (ValueError, TypeError, OverflowError):
+            return type_error
+        if min_value is not None and num_value < min_value:
+            return min_error
+        if max_value is not None and num_value > max_value:
+            return max_error
+        if integer and not num_value.is_integer():
+            return integer_error
+        return None
+
+    return [check_number]
+
+
+def _compile_range(param: Param) -> List[Check]:
+    """
+    Build checks for range content: a number, or a [low, high] pair, with
+    every value within bounds and on the step grid (min + k * step).
+    """
+    content = param.content
+    low, high, step = content.min, content.max, content.step
+
+    type_error = ValidationError(
+        field=param.name,
+        message=f"{param.description} must be a number or a pair of numbers",
+        code="type"
+    )
+    min_error = ValidationError(
+        field=param.name,
+        message=f"{param.description} must be at least {low}",
+        code="min"
+    )
+    max_error = ValidationError(
+        field=param.name,
+        message=f"{param.description} must be at most {high}",
+        code="max"
+    )
+    step_error = ValidationError(
+        field=param.name,
+        message=f"{param.description} must be in steps of {step}",
+        code="step"
+    )
+    order_error = ValidationError(
+        field=param.name,
+        message=f"{param.description} must not start above its end",
+        code="range"
+    )
+    # Tolerance for float error when snapping to the step grid
+    tolerance = 1e-9 * max(1.0, abs(high - low) / step) if step else 0.0
+
+    def check_range(value: Any) -> Optional[ValidationError]:
+        items = value if type(value) is list else (value,)
+        if not 1 <= len(items) <= 2:
+            return type_error
+        numbers = []
+        for item in items:
+            try:
+                number = float(item)
+            except (ValueError, TypeError, OverflowError):
+                return type_error
+            if number != number:  # NaN
+                return type_error
+            if number < low:
+                return min_error
+            if number > high:
+                return max_error
+            if step:
+                position = (number - low) / step
+                if abs(position - round(position)) > tolerance:
+                    return step_error
+            numbers.append(number)
+        if len(numbers) == 2 and numbers[0] > numbers[1]:
+            return order_error
+        return None
+
+    return [check_range]
+
+
+def _compile_boolean(param: Param) -> List[Check]:
+    """Build the type check for boolean content."""
+    type_error = ValidationError(
+        field=param.name,
+        message=f"{param.description} must be true or false",
+        code="type"
+    )
+
+    def check_boolean(value: Any) -> Optional[ValidationError]:
+        if type(value) is not bool:
+            return type_error
+        return None
+
+    return [check_boolean]
+
+
+def _parse_datetime(text: str) -> datetime:
+    value = datetime.fromisoformat(text)
+    if value.tzinfo is not None:
+        value = value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value
+
+
+def _parse_time(text: str) -> time:
+    return time.fromisoformat(text).replace(tzinfo=None)
+
+
+# ISO 8601 parser and error wording per date content type
+_TEMPORAL_TYPES: Dict[str, Tuple[Callable[[str], Any], str]] = {
+    "date": (date.fromisoformat, "date"),
+    "datetime": (_parse_datetime, "date and time"),
+    "time": (_parse_time, "time"),
+}
+
+
+def _compile_date(param: Param) -> List[Check]:
+    """
+    Build format, bound and disabledDates checks for date/datetime/time
+    content. Bounds and disabled dates are parsed once here; values are
+    ISO 8601 strings, and an empty value is treated as not filled in.
+    """
+    content = param.content
+    parse, kind = _TEMPORAL_TYPES[content.type]
+    try:
+        min_value = parse(content.min) if content.min else None
+        max_value = parse(content.max) if content.max else None
+        disabled = frozenset(date.fromisoformat(day) for day in content.disabledDates or ())
+    except ValueError as e:
+        raise ValueError(f"Parameter '{param.name}': invalid date bound: {e}") from None
+
+    type_error = ValidationError(
+        field=param.name,
+        message=f"{param.description} must be a valid {kind}",
+        code="type"
+    )
+    min_error = ValidationError(
+        field=param.name,
+        message=f"{param.description} must not be before {content.min}",
+        code="min"
+    )
+    max_error = ValidationError(
+        field=param.name,
+        message=f"{param.description} must not be after {content.max}",
+        code="max"
+    )
+    disabled_error = ValidationError(
+        field=param.name,
+        message=f"{param.description} is not an available date",
+        code="disabledDate"
+    )
+    check_disabled = bool(disabled) and content.type != "time"
+
+    def check_date(value: Any) -> Optional[ValidationError]:
+        if value is None or value == "":
+            return None
+        if type(value) is not str:
+            return type_error
+        try:
+            parsed = parse(value)
+        except ValueError:
+            return type_error
+        if min_value is not None and parsed < min_value:
+            return min_error
+        if max_value is not None and parsed > max_value:
+            return max_error
+        if check_disabled and (parsed if kind == "date" else parsed.date()) in disabled:
+            return disabled_error
+        return None
+
+    return [check_date]
+
+
+def _option_set(values: Iterable[EnumValue]) -> FrozenSet[str]:
+    return frozenset(option.value for option in values)
+
+
+def is_multiple(param: Param) -> bool:
+    """Whether a param's value is a list of selected options."""
+    return param.type == "multi_select" or bool(getattr(param.content, "multiple", False))
+
+
+def _options_check(
+    param: Param,
+    max_selections: Optional[int] = None
+) -> Tuple[Callable[[Any, Optional[FrozenSet[str]]], Optional[ValidationError]], ValidationError]:
+    """
+    Build the membership test shared by static and dependent enums, and
+    its enum error. The test takes the value and the allowed set (None
+    skips membership); None and "" mean nothing is selected.
+    """
+    enum_error = ValidationError(
+        field=param.name,
+        message=f"{param.description} must be one of the allowed options",
+        code="enum"
+    )
+
+    if not is_multiple(param):
+        def check_option(value: Any, allowed: Optional[FrozenSet[str]]) -> Optional[ValidationError]:
+            if value is None or value == "" or allowed is None:
+                return None
+            if type(value) is not str or value not in allowed:
+                return enum_error
+            return None
+
+        return check_option, enum_error
+
+    type_error = ValidationError(
+        field=param.name,
+        message=f"{param.description} must be a list of options",
+        code="type"
+    )
+    max_selections_error = ValidationError(
+        field=param.name,
+        message=f"{param.description} allows at most {max_selections} selections",
+        code="maxSelections"
+    )
+
+    def check_options(value: Any, allowed: Optional[FrozenSet[str]]) -> Optional[ValidationError]:
+        if value is None or value == "":
+            return None
+        if type(value) is not list:
+            return type_error
+        if max_selections is not None and len(value) > max_selections:
+            return max_selections_error
+        if allowed is not None:
+            try:
+                if not allowed.issuperset(value):
+                    return enum_error
+            except TypeError:  # Unhashable items can't be options
+                return enum_error
+        return None
+
+    return check_options, enum_error
+
+
+def _compile_enum(param: Param) -> List[Check]:
+    """Build membership and maxSelections checks for static enum content."""
+    content = param.content
+    # Options loaded from a `source` endpoint can't be checked here
+    allowed = _option_set(content.values) if content.values else None
+    check_options, enum_error = _options_check(param, content.maxSelections)
+
+    def check_enum(value: Any) -> Optional[ValidationError]:
+        return check_options(value, allowed)
+
+    if is_multiple(param):
+        return [check_enum]
+    if allowed is None:
+        return []
+    return [_vector("enum", allowed=allowed | {""}, error=enum_error)(check_enum)]
+
+
+def _compile_dependent_options(param: Param) -> List[RuleCheck]:
+    """
+    Build the cascade-consistency check for dependent enum content: the
+    value must be one of the options mapped to the parent's current value.
+    Unmapped or missing parent values are not checked.
+    """
+    content = param.content
+    parents = content.dependsOn if isinstance(content.dependsOn, list) else [content.dependsOn]
+    if not content.mapping or len(parents) != 1:
+        return []
+
+    parent = parents[0]
+    options = {parent_value: _option_set(values) for parent_value, values in content.mapping.items()}
+    check_options, _ = _options_check(param)
+
+    def check_dependent(data: Dict[str, Any], name=param.name) -> Optional[ValidationError]:
+        parent_value = data.get(parent)
+        if type(parent_value) is not str:
+            return None
+        return check_options(data[name], options.get(parent_value))
+
+    return [check_dependent]
+
+
+def _compile_rules(param: Param) -> List[Check]:
+    """Build checks for x-validation rules that carry a regex pattern."""
+    checks: List[Check] = []
+    timeout_error = _pattern_timeout_error(param)
+    max_length = _max_length(param)
+
+    for rule in param.x_validation or []:
+        if not rule.pattern or rule.endpoint or rule.condition:
+            continue
+        match = PATTERN_CACHE.get(rule.pattern).match
+        rule_error = ValidationError(field=param.name, message=rule.message, code=rule.rule)
+
+        def check_rule(value: Any, match=match, rule_error=rule_error) -> Optional[ValidationError]:
+            text = str(value)
+            if max_length is not None and len(text) > max_length:
+                return None
+            try:
+                if not match(text):
+                    return rule_error
+            except PatternTimeout:
+                return timeout_error
+            return None
+
+        checks.append(_vector(
+            "pattern", match=match, max_length=max_length,
+            error=rule_error, timeout_error=timeout_error
+        )(check_rule))
+
+    return checks
+
+
+def _compile_conditional_rules(param: Param) -> List[RuleCheck]:
+    """
+    Build cross-field checks for x-validation rules with a condition.
+
+    The rule fails when its condition is false. It is skipped while any of
+    its fields (`fields`, or the names used by the condition) is missing or
+    empty.
+    A rule that also has a pattern only applies the pattern while the
+    condition holds.
+    """
+    checks: List[RuleCheck] = []
+    timeout_error = _pattern_timeout_error(param)
+    max_length = _max_length(param)
+
+    for rule in param.x_validation or []:
+        if not rule.condition or rule.endpoint:
+            continue
+        condition = compile_expression(rule.condition)
+        fields = tuple(rule.fields or sorted(condition.names))
+        rule_error = ValidationError(field=param.name, message=rule.message, code=rule.rule)
+
+        if rule.pattern:
+            match = PATTERN_CACHE.get(rule.pattern).match
+
+            def check_rule(data: Dict[str, Any], condition=condition, match=match,
+                           rule_error=rule_error, name=param.name) -> Optional[ValidationError]:
+                if not condition(data):
+                    return None
+                text = str(data[name])
+                if max_length is not None and len(text) > max_length:
+                    return None
+                try:
+                    if not match(text):
+                        return rule_error
+                except PatternTimeout:
+                    return timeout_error
+                return None
+        else:
+            def check_rule(data: Dict[str, Any], condition=condition, fields=fields,
+                           rule_error=rule_error) -> Optional[ValidationError]:
+                for field in fields:
+                    if data.get(field) in (None, ""):
+                        return None
+                if not condition(data):
+                    return rule_error
+                return None
+
+        checks.append(check_rule)
+
+    return checks
+
+
+# Check compilers keyed by content type
+_CHECK_COMPILERS: Dict[str, Callable[[Param], List[Check]]] = {
+    "string": _compile_string,
+    "number": _compile_number,
+    "integer": _compile_number,
+    "enum": _compile_enum,
+    "number_range": _compile_range,
+    "boolean": _compile_boolean,
+    "date": _compile_date,
+    "datetime": _compile_date,
+    "time": _compile_date,
+}
+
+
+def register_check_compiler(content_type: str, compiler: Callable[[Param], List[Check]]) -> None:
+    """
+    Register (or replace) the check compiler for a content type. Register
+    at import time so worker processes, which import this module fresh,
+    see the same compilers.
+    """
+    _CHECK_COMPILERS[content_type] = compiler
+
+
+# ============================================================================
+# Schema Compiler
+# ============================================================================
+
+def compile_param(param: Param) -> FieldPlan:
+    """Compile a single parameter into its field plan."""
+    required_error = None
+    if param.required:
+        required_error = ValidationError(
+            field=param.name,
+            message=f"{param.description} is required",
+            code="required"
+        )
+
+    compiler = _CHECK_COMPILERS.get(param.content.type)
+    checks = (compiler(param) if compiler else []) + _compile_rules(param)
+
+    try:
+        visible = compile_expression(param.x_visibility.condition) if param.x_visibility else None
+        rules = _compile_conditional_rules(param)
+        if param.content.type == "dependent_enum":
+            rules = _compile_dependent_options(param) + rules
+    except ValueError as e:
+        raise ValueError(f"Parameter '{param.name}': {e}") from None
+
+    return FieldPlan(param.name, required_error, tuple(checks), visible, tuple(rules))
+
+
+def compile_schema(schema: FormSchema) -> ValidatorPlan:
+    """
+    Compile a form schema into a flat validator plan.
+
+    Raises ValueError if a condition is invalid or refers to a parameter
+    the schema does not define.
+    """
+    params = [param for category in schema.paramCategories for param in category.params]
+    known = {param.name for param in params}
+
+    for param in params:
+        conditions = [rule.condition for rule in param.x_validation or [] if rule.condition]
+        if param.x_visibility:
+            conditions.append(param.x_visibility.condition)
+        for condition in conditions:
+            try:
+                unknown = compile_expression(condition).names - known
+            except ValueError as e:
+                raise ValueError(f"Parameter '{param.name}': {e}") from None
+            if unknown:
+                raise ValueError(
+                    f"Parameter '{param.name}': condition {condition!r} refers to "
+                    f"unknown parameter(s) {', '.join(sorted(unknown))}"
+                )
+
+    return ValidatorPlan(tuple(compile_param(param) for param in params))
+
+
+def validate_many(
+    resolve: Callable[[Optional[str], Optional[str]], Optional[ValidatorPlan]],
+    submissions: Sequence[FormSubmission]
+) -> List[List[ValidationError]]:
+    """
+    Validate many submissions, grouped by formId and schemaVersion so each
+    plan is resolved once per group; `resolve(form_id, version)` returns the
+    plan or None for unknown forms. Groups where columnar validation wins
+    (see use_columnar) are validated column by column. Results are returned
+    in input order.
+    """
+    groups: Dict[Tuple[Optional[str], Optional[str]], List[int]] = {}
+    for index, submission in enumerate(submissions):
+        groups.setdefault((submission.formId, submission.schemaVersion), []).append(index)
+
+    results: List[List[ValidationError]] = [[] for _ in submissions]
+    for (form_id, version), indices in groups.items():
+        plan = resolve(form_id, version) if form_id else None
+        if plan is None:
+            continue
+        if use_columnar(plan, len(indices)):
+            bitmap = validate_columns(plan, [submissions[index].data for index in indices])
+            for index, errors in zip(indices, bitmap.expand()):
+                results[index] = errors
+            continue
+
+        validate = plan.validate
+        for index in indices:
+            results[index] = validate(submissions[index].data)
+
+    return results
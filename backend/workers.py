@@ -0,0 +1,238 @@
+"""
+Process pool for CPU-heavy validation.
+Workers compile a schema version the first time they are asked to validate
+against it and keep the plan, keyed by the schema's content version; after
+that only submission payloads cross the process boundary. Small
+submissions are validated inline, since shipping them to another process
+costs more than validating them.
+"""
+
+import asyncio
+import multiprocessing
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from models import FormSchema, FormSubmission, ValidationError
+from registry import SchemaRegistry, SchemaVersionUnavailable
+from validation import ValidatorPlan, compile_schema, validate_many
+
+
+# Submissions whose estimated payload size is below this are validated inline
+DEFAULT_OFFLOAD_BYTES = 16 * 1024
+
+# Compiled schema versions kept per worker process
+WORKER_PLAN_CACHE_SIZE = 256
+
+
+# ============================================================================
+# Worker Process
+# ============================================================================
+
+# Identifies one schema version: (form_id, version)
+PlanKey = Tuple[str, str]
+
+# Validator plans compiled in this worker process
+_WORKER_PLANS: "OrderedDict[PlanKey, ValidatorPlan]" = OrderedDict()
+
+
+class PlanMissing(Exception):
+    """The worker has not compiled these schema versions yet."""
+
+
+def _worker_plans(keys: Iterable[PlanKey], schemas: Optional[Dict[PlanKey, bytes]]) -> Dict[PlanKey, ValidatorPlan]:
+    """Resolve schema versions to plans, compiling versions sent in `schemas`."""
+    plans: Dict[PlanKey, ValidatorPlan] = {}
+    missing = []
+    for key in keys:
+        plan = _WORKER_PLANS.get(key)
+        if plan is None and schemas and key in schemas:
+            plan = compile_schema(FormSchema.model_validate_json(schemas[key]))
+            _WORKER_PLANS[key] = plan
+            if len(_WORKER_PLANS) > WORKER_PLAN_CACHE_SIZE:
+                _WORKER_PLANS.popitem(last=False)
+        if plan is None:
+            missing.append(key)
+        else:
+            _WORKER_PLANS.move_to_end(key)
+            plans[key] = plan
+    if missing:
+        raise PlanMissing(missing)
+    return plans
+
+
+def _validate_one(
+    key: PlanKey, data: Dict[str, Any], schemas: Optional[Dict[PlanKey, bytes]] = None
+) -> List[ValidationError]:
+    return _worker_plans([key], schemas)[key].validate(data)
+
+
+def _validate_batch(
+    versions: Dict[Tuple[str, Optional[str]], str],
+    submissions: List[FormSubmission],
+    schemas: Optional[Dict[PlanKey, bytes]] = None
+) -> List[List[ValidationError]]:
+    """`versions` maps each (formId, schemaVersion) in the batch to a resolved version."""
+    plans = _worker_plans(
+        {(form_id, version) for (form_id, _), version in versions.items()}, schemas
+    )
+
+    def resolve(form_id: Optional[str], pinned: Optional[str]) -> Optional[ValidatorPlan]:
+        version = versions.get((form_id, pinned))
+        return plans[(form_id, version)] if version is not None else None
+
+    return validate_many(resolve, submissions)
+
+
+def payload_size(value: Any) -> int:
+    """Rough size of a submission payload: string lengths plus a few bytes per scalar."""
+    if isinstance(value, str):
+        return len(value)
+    if isinstance(value, dict):
+        return sum(len(key) + payload_size(item) for key, item in value.items())
+    if isinstance(value, (list, tuple)):
+        return sum(payload_size(item) for item in value)
+    return 8
+
+
+# ============================================================================
+# Validation Pool
+# ============================================================================
+
+class ValidationPool:
+    """
+    Validates submissions inline or in a process pool, depending on size.
+
+    With `workers=0` the pool is disabled and everything runs inline. The
+    executor is created by start() (from the application lifespan) so that
+    importing this module never spawns processes.
+    """
+
+    def __init__(
+        self,
+        registry: SchemaRegistry,
+        workers: int = 0,
+        offload_bytes: int = DEFAULT_OFFLOAD_BYTES
+    ):
+        self.registry = registry
+        self.workers = workers
+        self.offload_bytes = offload_bytes
+        self.inline = 0
+        self.offloaded = 0
+        self._executor: Optional[ProcessPoolExecutor] = None
+
+    def start(self) -> None:
+        """Start the worker processes (no-op when disabled)."""
+        if self.workers <= 0 or self._executor is not None:
+            return
+        self._executor = ProcessPoolExecutor(
+            max_workers=self.workers,
+            mp_context=multiprocessing.get_context("spawn")
+        )
+
+    def close(self) -> None:
+        """Stop the worker processes."""
+        if self._executor is not None:
+            self._executor.shutdown(cancel_futures=True)
+            self._executor = None
+
+    async def validate(
+        self,
+        form_id: Optional[str],
+        data: Dict[str, Any],
+        version: Optional[str] = None,
+        observe: Optional[Callable[[str, float], None]] = None
+    ) -> List[ValidationError]:
+        """
+        Validate one submission against the current schema version, or
+        `version` if given; unknown forms have no errors. With `observe`,
+        inline validations report per-check timings (ValidatorPlan.profile).
+        """
+        entry = self.registry.get(form_id, version) if form_id else None
+        if entry is None:
+            return []
+        if self._executor is None or payload_size(data) < self.offload_bytes:
+            self.inline += 1
+            if observe is not None:
+                return entry.plan.profile(data, observe)
+            return entry.plan.validate(data)
+        self.offloaded += 1
+        key = (form_id, entry.version)
+        return await self._submit(_validate_one, key, data, schemas={key: entry.serialized.body})
+
+    async def validate_many(self, submissions: Sequence[FormSubmission]) -> List[List[ValidationError]]:
+        """
+        Validate a batch, split into one chunk per worker when its total
+        payload reaches the offload threshold. Results are in input order.
+        Submissions pinned to a schema version that is no longer kept get a
+        single "schemaVersion" error rather than failing the whole batch.
+        """
+        unavailable = self._unavailable_versions(submissions)
+        if unavailable:
+            keys = [(s.formId, s.schemaVersion) for s in submissions]
+            keep = [i for i, key in enumerate(keys) if key not in unavailable]
+            results = [[unavailable[key]] if key in unavailable else [] for key in keys]
+            for index, errors in zip(keep, await self._validate_many([submissions[i] for i in keep])):
+                results[index] = errors
+            return results
+        return await self._validate_many(submissions)
+
+    def _unavailable_versions(
+        self, submissions: Sequence[FormSubmission]
+    ) -> Dict[Tuple[Optional[str], Optional[str]], ValidationError]:
+        """Errors for the (formId, schemaVersion) pairs whose version is no longer kept."""
+        errors: Dict[Tuple[Optional[str], Optional[str]], ValidationError] = {}
+        for form_id, pinned in {(s.formId, s.schemaVersion) for s in submissions if s.formId and s.schemaVersion}:
+            try:
+                self.registry.get(form_id, pinned)
+            except SchemaVersionUnavailable as e:
+                errors[(form_id, pinned)] = ValidationError(
+                    field="schemaVersion",
+                    message=f"The form has changed since it was loaded (current version: {e.current})",
+                    code="schemaVersion"
+                )
+        return errors
+
+    async def _validate_many(self, submissions: Sequence[FormSubmission]) -> List[List[ValidationError]]:
+        if self._executor is None or len(submissions) < 2 or (
+            sum(payload_size(submission.data) for submission in submissions) < self.offload_bytes
+        ):
+            self.inline += len(submissions)
+            return validate_many(self.registry.plan, submissions)
+
+        # Resolve pinned versions here so workers never see a stale "current"
+        self.offloaded += len(submissions)
+        versions: Dict[Tuple[str, Optional[str]], str] = {}
+        schemas: Dict[PlanKey, bytes] = {}
+        for form_id, pinned in {(s.formId, s.schemaVersion) for s in submissions if s.formId}:
+            entry = self.registry.get(form_id, pinned)
+            if entry is not None:
+                versions[(form_id, pinned)] = entry.version
+                schemas[(form_id, entry.version)] = entry.serialized.body
+
+        size = -(-len(submissions) // self.workers)
+        chunks = await asyncio.gather(*[
+            self._submit(_validate_batch, versions, list(submissions[i:i + size]), schemas=schemas)
+            for i in range(0, len(submissions), size)
+        ])
+        return [errors for chunk in chunks for errors in chunk]
+
+    async def _submit(self, fn, *args, schemas: Dict[PlanKey, bytes]):
+        """
+        Run a task in the pool, sending only schema versions; a worker that
+        has not compiled a version yet gets the schema on a retry.
+        """
+        loop = asyncio.get_running_loop()
+        try:
+            return await loop.run_in_executor(self._executor, fn, *args)
+        except PlanMissing:
+            return await loop.run_in_executor(self._executor, fn, *args, schemas)
+
+    def stats(self) -> Dict[str, int]:
+        """Worker count and inline/offloaded counters."""
+        return {
+            "workers": self.workers if self._executor is not None else 0,
+            "offload_bytes": self.offload_bytes,
+            "inline": self.inline,
+            "offloaded": self.offloaded,
+        }
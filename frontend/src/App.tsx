@@ -7,6 +7,7 @@ function App() {
   const [schemas, setSchemas] = useState<Record<string, string>>({});
   const [selectedSchemaId, setSelectedSchemaId] = useState<string>('');
   const [currentSchema, setCurrentSchema] = useState<FormSchema | null>(null);
+  const [schemaVersion, setSchemaVersion] = useState<string | undefined>(undefined);
   const [loading, setLoading] = useState(false);
   const [error, setError] = useState<string | null>(null);
 
@@ -34,8 +35,9 @@ function App() {
     setError(null);
 
     getSchema(selectedSchemaId)
-      .then((schema) => {
+      .then(({ schema, version }) => {
         setCurrentSchema(schema);
+        setSchemaVersion(version);
         setLoading(false);
       })
       .catch((err) => {
@@ -149,6 +151,7 @@ function App() {
               <DynamicForm
                 schema={currentSchema}
                 schemaId={selectedSchemaId}
+                schemaVersion={schemaVersion}
                 onSuccess={handleSuccess}
                 onError={handleError}
               />
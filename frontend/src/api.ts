@@ -8,6 +8,7 @@ import type {
   FormSubmission,
   FormValidationResponse,
   FormSubmissionResponse,
+  ValidationError,
 } from './types';
 
 const API_BASE_URL = import.meta.env.VITE_API_URL || 'http://localhost:8000';
@@ -28,9 +29,14 @@ export async function listSchemas(): Promise<Record<string, string>> {
   return response.data;
 }
 
-export async function getSchema(schemaId: string): Promise<FormSchema> {
+export interface VersionedSchema {
+  schema: FormSchema;
+  version?: string;  // X-Schema-Version; send back as schemaVersion when validating or submitting
+}
+
+export async function getSchema(schemaId: string): Promise<VersionedSchema> {
   const response = await api.get(`/api/schemas/${schemaId}`);
-  return response.data;
+  return { schema: response.data, version: response.headers['x-schema-version'] };
 }
 
 // ============================================================================
@@ -60,6 +66,31 @@ export async function validateForm(submission: FormSubmission): Promise<FormVali
   return response.data;
 }
 
+export interface IncrementalValidationResponse {
+  valid: boolean;
+  errors: ValidationError[];
+  validated: string[];
+  reset: string[];
+}
+
+export async function validateIncremental(
+  formId: string,
+  data: Record<string, any>,
+  changes: Record<string, any>,
+  schemaVersion?: string
+): Promise<IncrementalValidationResponse> {
+  const response = await api.post('/api/validate/incremental', { formId, schemaVersion, data, changes });
+  return response.data;
+}
+
+/**
+ * Whether a request failed because the form's schema version is no longer
+ * available (409): the form must be reloaded before it can be submitted.
+ */
+export function isSchemaVersionConflict(error: unknown): boolean {
+  return axios.isAxiosError(error) && error.response?.status === 409;
+}
+
 // ============================================================================
 // Submission APIs
 // ============================================================================
@@ -69,9 +100,18 @@ export async function submitForm(submission: FormSubmission): Promise<FormSubmis
   return response.data;
 }
 
-export async function getSubmissions(formId?: string): Promise<any[]> {
+export interface SubmissionPage {
+  items: any[];
+  nextCursor: number | null;
+  count: number | null;
+}
+
+export async function getSubmissions(
+  formId?: string,
+  options: { limit?: number; after?: number } = {}
+): Promise<SubmissionPage> {
   const response = await api.get('/api/submissions', {
-    params: formId ? { form_id: formId } : {},
+    params: formId ? { form_id: formId, ...options } : options,
   });
   return response.data;
 }
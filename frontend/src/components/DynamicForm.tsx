@@ -1,6 +1,6 @@
-import React, { useState } from 'react';
+import React, { useEffect, useRef, useState } from 'react';
 import type { FormSchema, FormData, Param, ValidationError } from '../types';
-import { submitForm, validateForm } from '../api';
+import { isSchemaVersionConflict, submitForm, validateForm, validateIncremental } from '../api';
 import {
   TextField,
   NumberField,
@@ -14,9 +14,13 @@ import {
   SwitchField,
 } from './fields';
 
+// Typing in a field re-validates it once input pauses for this long
+const VALIDATION_DEBOUNCE_MS = 300;
+
 interface DynamicFormProps {
   schema: FormSchema;
   schemaId?: string;
+  schemaVersion?: string;
   onSuccess?: (data: any) => void;
   onError?: (error: any) => void;
 }
@@ -24,6 +28,7 @@ interface DynamicFormProps {
 export const DynamicForm: React.FC<DynamicFormProps> = ({
   schema,
   schemaId,
+  schemaVersion,
   onSuccess,
   onError,
 }) => {
@@ -35,7 +40,50 @@ export const DynamicForm: React.FC<DynamicFormProps> = ({
     text: string;
   } | null>(null);
 
+  // Fields the user has changed; inline errors are only shown for these
+  const touched = useRef<Set<string>>(new Set());
+  // Change waiting for its debounce to run inline validation
+  const pendingChange = useRef<{ field: string; value: any; timer: number } | null>(null);
+  // Latest inline validation per changed field; older responses are dropped
+  const latestValidation = useRef<Record<string, number>>({});
+  const validationCount = useRef(0);
+
+  useEffect(() => () => window.clearTimeout(pendingChange.current?.timer), []);
+
+  // Drop pending and in-flight inline validations (on submit and reset)
+  const cancelInlineValidation = () => {
+    window.clearTimeout(pendingChange.current?.timer);
+    pendingChange.current = null;
+    latestValidation.current = {};
+  };
+
+  // Re-validate a changed field and its dependents on the server
+  const validateChange = async (fieldName: string, value: any, data: FormData) => {
+    const sequence = ++validationCount.current;
+    latestValidation.current[fieldName] = sequence;
+    try {
+      const result = await validateIncremental(schemaId!, data, { [fieldName]: value }, schemaVersion);
+      if (latestValidation.current[fieldName] !== sequence) {
+        return;
+      }
+      setErrors((prev) => {
+        const newErrors = { ...prev };
+        // Fields cleared by cascadeReset reset their own value
+        [...result.validated, ...result.reset].forEach((name) => delete newErrors[name]);
+        result.errors.forEach((error: ValidationError) => {
+          if (touched.current.has(error.field)) {
+            newErrors[error.field] = error.message;
+          }
+        });
+        return newErrors;
+      });
+    } catch {
+      // Inline validation is best-effort; the form is validated again on submit
+    }
+  };
+
   const handleFieldChange = (fieldName: string, value: any) => {
+    const previous = formData[fieldName];
     setFormData((prev) => ({
       ...prev,
       [fieldName]: value,
@@ -49,6 +97,26 @@ export const DynamicForm: React.FC<DynamicFormProps> = ({
         return newErrors;
       });
     }
+
+    // Dependent fields reset themselves to '' when they mount
+    if (!schemaId || (previous ?? '') === (value ?? '')) {
+      return;
+    }
+    touched.current.add(fieldName);
+
+    // A change to another field sends the pending one right away
+    const pending = pendingChange.current;
+    if (pending) {
+      window.clearTimeout(pending.timer);
+      if (pending.field !== fieldName) {
+        validateChange(pending.field, pending.value, formData);
+      }
+    }
+    const timer = window.setTimeout(() => {
+      pendingChange.current = null;
+      validateChange(fieldName, value, formData);
+    }, VALIDATION_DEBOUNCE_MS);
+    pendingChange.current = { field: fieldName, value, timer };
   };
 
   const renderField = (param: Param) => {
@@ -112,11 +180,13 @@ export const DynamicForm: React.FC<DynamicFormProps> = ({
     setIsSubmitting(true);
     setSubmitMessage(null);
     setErrors({});
+    cancelInlineValidation();
 
     try {
       // Validate form
       const validationResult = await validateForm({
         formId: schemaId,
+        schemaVersion,
         data: formData,
       });
 
@@ -137,6 +207,7 @@ export const DynamicForm: React.FC<DynamicFormProps> = ({
       // Submit form
       const result = await submitForm({
         formId: schemaId,
+        schemaVersion,
         data: formData,
       });
 
@@ -150,6 +221,7 @@ export const DynamicForm: React.FC<DynamicFormProps> = ({
         }
         // Reset form
         setFormData({});
+        touched.current.clear();
       } else {
         setSubmitMessage({
           type: 'error',
@@ -162,7 +234,9 @@ export const DynamicForm: React.FC<DynamicFormProps> = ({
     } catch (error) {
       setSubmitMessage({
         type: 'error',
-        text: 'An error occurred while submitting the form.',
+        text: isSchemaVersionConflict(error)
+          ? 'This form has been updated. Please reload the page and try again.'
+          : 'An error occurred while submitting the form.',
       });
       if (onError) {
         onError(error);
@@ -205,6 +279,8 @@ export const DynamicForm: React.FC<DynamicFormProps> = ({
           type="button"
           className="btn-secondary"
           onClick={() => {
+            cancelInlineValidation();
+            touched.current.clear();
             setFormData({});
             setErrors({});
             setSubmitMessage(null);
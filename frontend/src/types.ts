@@ -167,6 +167,7 @@ export interface FormData {
 
 export interface FormSubmission {
   formId?: string;
+  schemaVersion?: string;  // X-Schema-Version of the schema the form was rendered from
   data: FormData;
 }
 